@@ -0,0 +1,40 @@
+"""
+Measures looking up keys through thousands of aliases, including chains of
+aliases and keys nested under an alias, and registering the aliases.
+"""
+import time
+
+from gila import Gila
+from common import best_of, report
+
+ALIASES = 5000
+CHAIN = 10
+
+
+def main():
+    gila = Gila()
+    for index in range(ALIASES):
+        gila.set_default(f'key{index}', index)
+    start = time.perf_counter()
+    for index in range(ALIASES):
+        gila.register_alias(f'alias{index}', f'key{index}')
+    # Each link points at the one before it, which ends at key0
+    gila.register_alias('link0', 'key0')
+    for index in range(1, CHAIN):
+        gila.register_alias(f'link{index}', f'link{index - 1}')
+    report(f'register {ALIASES + CHAIN} aliases',
+           time.perf_counter() - start)
+
+    baseline = best_of(lambda: gila.get('key0'), number=20000)
+    report('gila.get, no alias', baseline)
+    report('gila.get, alias', best_of(lambda: gila.get('alias0'),
+                                      number=20000), baseline)
+    report(f'gila.get, chain of {CHAIN}',
+           best_of(lambda: gila.get(f'link{CHAIN - 1}'), number=20000),
+           baseline)
+    report('gila.get, nested under an alias',
+           best_of(lambda: gila.get('alias0.sub'), number=20000), baseline)
+
+
+if __name__ == '__main__':
+    main()
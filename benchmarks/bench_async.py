@@ -0,0 +1,68 @@
+"""
+Measures how long the event loop is held up while a large YAML config file
+is read in: with gila.read_config_file() called on the loop, and with
+gila.aread_config_file() parsing it in a thread or in another process.
+"""
+import asyncio
+import os
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from gila import Gila
+from common import report
+from synthetic import nested_config, write_config
+
+KEYS = 20000
+DEPTH = 3
+TICK = 0.001
+
+
+async def worst_lag(read):
+    # Runs read while a ticker sleeps for TICK at a time, and returns the
+    # longest the ticker was kept waiting past its wake up time, and how
+    # long read took
+    done = asyncio.Event()
+    lags = [0.0]
+
+    async def ticker():
+        while not done.is_set():
+            start = perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(perf_counter() - start - TICK)
+
+    ticking = asyncio.ensure_future(ticker())
+    await asyncio.sleep(TICK)
+    start = perf_counter()
+    await read()
+    elapsed = perf_counter() - start
+    done.set()
+    await ticking
+    return max(lags), elapsed
+
+
+def main():
+    print(f'{KEYS} keys, {DEPTH} levels deep')
+    with TemporaryDirectory() as tempdir:
+        config_file = os.path.join(tempdir, 'config.yaml')
+        write_config(nested_config(KEYS, DEPTH), config_file)
+        gila = Gila()
+        gila.set_config_file(config_file)
+
+        async def on_loop():
+            gila.read_config_file()
+
+        reads = [
+            ('read_config_file on the loop', on_loop),
+            ('aread_config_file', gila.aread_config_file),
+            ('aread_config_file, processes',
+             lambda: gila.aread_config_file(processes=True)),
+        ]
+        loop = asyncio.get_event_loop()
+        for name, read in reads:
+            lag, elapsed = loop.run_until_complete(worst_lag(read))
+            report(f'{name}, read', elapsed)
+            report(f'{name}, worst loop lag', lag)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Compares reading a conf.d directory of config fragments one file at a
+time, on a thread pool and on a process pool, with parsing the slowest
+fragment on its own.
+"""
+import os
+from tempfile import TemporaryDirectory
+
+from gila import Gila
+from gila.util.helpers import yaml_to_dict
+from common import best_of, report
+from synthetic import nested_config, write_config
+
+FRAGMENTS = 16
+KEYS = 2000
+DEPTH = 3
+
+
+def read(directory: str, **kwargs):
+    gila = Gila()
+    gila.read_config_files([directory], **kwargs)
+    return gila
+
+
+def main():
+    print(f'{FRAGMENTS} yaml fragments of {KEYS} keys, {DEPTH} levels deep')
+    with TemporaryDirectory() as tempdir:
+        for number in range(FRAGMENTS):
+            config = {f'fragment{number}': nested_config(KEYS, DEPTH)}
+            write_config(config, os.path.join(tempdir, f'{number:02}.yaml'))
+        slowest = max(
+            best_of(lambda: yaml_to_dict(entry.path), number=1, repeat=3)
+            for entry in os.scandir(tempdir))
+        report('slowest single fragment', slowest)
+        baseline = best_of(lambda: read(tempdir, max_workers=1), number=1,
+                           repeat=3)
+        report('one at a time', baseline)
+        report('thread pool', best_of(
+            lambda: read(tempdir), number=1, repeat=3), baseline)
+        report('process pool', best_of(
+            lambda: read(tempdir, processes=True), number=1, repeat=3),
+            baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Compares finding the config file across several search paths on a
+simulated slow filesystem, where every stat and directory scan takes a
+fixed time, eg. a network filesystem or a cold container.
+"""
+import os
+from functools import wraps
+from tempfile import TemporaryDirectory
+from time import sleep, time
+
+# Seconds added to every stat and directory scan
+LATENCY = 0.001
+SEARCH_PATHS = 10
+EXTENSIONS = ['.yaml', '.yml', '.toml', '.json', '.hcl', '.properties',
+              '.props', '.prop', '.env']
+
+
+def slow(func):
+    @wraps(func)
+    def call(*args, **kwargs):
+        sleep(LATENCY)
+        return func(*args, **kwargs)
+    return call
+
+
+# Patched before gila is imported, so that it picks up the slow versions
+os.stat = slow(os.stat)
+os.scandir = slow(os.scandir)
+
+from gila import Gila  # noqa: E402
+from common import best_of, report  # noqa: E402
+
+
+def search_with_stats(paths: list):
+    # How the config file was found before, one stat per extension
+    for path in paths:
+        for ext in EXTENSIONS:
+            filepath = os.path.join(path, f'config{ext}')
+            if os.path.exists(filepath):
+                return filepath
+    return None
+
+
+def read(paths: list):
+    gila = Gila()
+    gila.set_config_name('config')
+    for path in paths:
+        gila.add_config_path(path)
+    gila.read_config_file()
+    return gila
+
+
+def read_with_stats(paths: list):
+    gila = Gila()
+    gila.set_config_file(search_with_stats(paths))
+    gila.read_config_file()
+    return gila
+
+
+def touch(paths: list, mtime: float):
+    # Changes the modification time of every path, as adding a file would
+    for path in paths:
+        os.utime(path, (mtime, mtime))
+
+
+def main():
+    print(f'{SEARCH_PATHS} search paths, {LATENCY * 1e3:.1f}ms per stat')
+    with TemporaryDirectory() as tempdir:
+        paths = []
+        for number in range(SEARCH_PATHS):
+            path = os.path.join(tempdir, f'path{number}')
+            os.mkdir(path)
+            paths.append(path)
+        # Only the last path holds the config file, the worst case
+        with open(os.path.join(paths[-1], 'config.json'), 'w') as config:
+            config.write('{"key": "value"}')
+        mtimes = iter(range(int(time()) - 3600, int(time())))
+        touch(paths, next(mtimes))
+
+        baseline = best_of(lambda: read_with_stats(paths), number=5,
+                           repeat=3)
+        report('stat per extension', baseline)
+
+        def read_cold():
+            # A new mtime makes every cached listing stale
+            touch(paths, next(mtimes))
+            return read(paths)
+        report('scandir per path, cold', best_of(
+            read_cold, number=5, repeat=3), baseline)
+        report('scandir per path, cached', best_of(
+            lambda: read(paths), number=5, repeat=3), baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Measures the memory each forked worker of a prefork server adds once it
+has looked up some keys of the config its master read in and run a garbage
+collection, with and without gila.prepare_for_fork() in the master.
+
+Looking a value up writes to its reference count, so the pages holding
+the values a worker uses always become its own. prepare_for_fork() keeps
+the garbage collector from doing the same to every other page.
+"""
+import gc
+import os
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from gila import Gila
+from common import in_workers, report
+from synthetic import leaf_keys, nested_config, write_config
+
+KEYS = 50000
+DEPTH = 3
+WORKERS = 8
+# Keys each worker looks up
+HOT_KEYS = 500
+
+
+def main():
+    print(f'{KEYS} keys, {DEPTH} levels deep, {WORKERS} workers')
+    keys = leaf_keys(KEYS, DEPTH)
+    with TemporaryDirectory() as tempdir:
+        config_file = os.path.join(tempdir, 'config.yaml')
+        write_config(nested_config(KEYS, DEPTH), config_file)
+        gila = Gila()
+        gila.set_config_file(config_file)
+        gila.read_config_file()
+
+    hot_keys = keys[::KEYS // HOT_KEYS]
+
+    def serve():
+        for key in hot_keys:
+            gila.get(key)
+        gc.collect()
+
+    added = in_workers(serve, WORKERS) / 1024
+    print(f'{"without prepare_for_fork":<48} {added:>12.1f} MB per worker')
+    start = perf_counter()
+    gila.prepare_for_fork()
+    report('prepare_for_fork', perf_counter() - start)
+    added = in_workers(serve, WORKERS) / 1024
+    print(f'{"with prepare_for_fork":<48} {added:>12.1f} MB per worker')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares gila.get_many against calling gila.get in a loop for a batch of
+keys that share parents, with every layer populated.
+"""
+import json
+import os
+from tempfile import TemporaryDirectory
+
+from gila import Gila
+from common import best_of, report
+
+SECTIONS = 8
+KEYS_PER_SECTION = 6
+
+
+def build(config_dir: str):
+    config = {}
+    for section in range(SECTIONS):
+        config[f'section{section}'] = {
+            'nested': {f'key{key}': key for key in range(KEYS_PER_SECTION)}
+        }
+    config_file = os.path.join(config_dir, 'config.json')
+    with open(config_file, 'w') as json_config:
+        json.dump(config, json_config)
+
+    gila = Gila()
+    gila.set_config_file(config_file)
+    gila.read_config_file()
+    gila.set_default('defaults.enabled', True)
+    gila.override('overridden', 'value')
+    gila.register_alias('legacy', 'section0.nested.key0')
+    os.environ['BENCH_BOUND'] = 'bound'
+    gila.set_env_prefix('BENCH')
+    gila.bind_env('bound')
+    gila.automatic_env()
+    return gila
+
+
+def main():
+    with TemporaryDirectory() as config_dir:
+        gila = build(config_dir)
+    keys = [f'section{section}.nested.key{key}'
+            for section in range(SECTIONS)
+            for key in range(KEYS_PER_SECTION)]
+    keys += ['legacy', 'overridden', 'bound', 'defaults.enabled']
+
+    def loop():
+        return {key: gila.get(key) for key in keys}
+
+    def batch():
+        return gila.get_many(keys)
+
+    assert loop() == batch()
+    print(f'{len(keys)} keys per batch')
+    for env in ('live env', 'env snapshot'):
+        if env == 'env snapshot':
+            gila.snapshot_env()
+        baseline = best_of(loop, number=200)
+        report(f'get() loop, {env}', baseline)
+        report(f'get_many(), {env}', best_of(batch, number=200), baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Measures how long `import gila` takes with `python -X importtime`, and
+exits non-zero if it is over budget so it can gate CI.
+
+Gila is byte-compiled first, so the budget covers loading the package and
+not compiling it. Without this, a checkout run with PYTHONDONTWRITEBYTECODE
+set compiles gila.gila from source on every run.
+"""
+import compileall
+import os
+import subprocess
+import sys
+from importlib.util import find_spec
+
+# Cumulative microseconds for `import gila`, with room for slow machines
+BUDGET_US = 50000
+RUNS = 5
+
+
+def import_time():
+    """
+    Returns the cumulative import time of gila in microseconds, as
+    reported by `python -X importtime`.
+    """
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import gila'],
+        stderr=subprocess.PIPE, check=True).stderr.decode()
+    for line in output.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'gila':
+            return int(fields[1])
+    raise RuntimeError('gila missing from -X importtime output')
+
+
+def compile_gila():
+    """
+    Writes the bytecode for every module of gila, which a discarded import
+    would not do with PYTHONDONTWRITEBYTECODE set.
+    """
+    package_dir = os.path.dirname(find_spec('gila').origin)
+    if not compileall.compile_dir(package_dir, quiet=1):
+        raise RuntimeError(f'could not compile {package_dir}')
+
+
+def main():
+    compile_gila()
+    best = min(import_time() for _ in range(RUNS))
+    print(f'{"import gila":<48} {best / 1e3:>12.3f} ms'
+          f'  (budget {BUDGET_US / 1e3:.0f} ms)')
+    if best > BUDGET_US:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
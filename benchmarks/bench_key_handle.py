@@ -0,0 +1,36 @@
+"""
+Compares looking up a nested, aliased key with gila.get, with the
+resolution cache enabled, and through a key handle, against a plain
+attribute lookup.
+"""
+from gila import Gila
+from common import best_of, report
+
+KEY = 'db.primary.pool.size'
+
+
+class Settings():
+    pool_size = 10
+
+
+def main():
+    gila = Gila()
+    gila.set_default('database.primary.pool.size', 10)
+    gila.register_alias('db', 'database')
+    gila.automatic_env()
+    gila.snapshot_env()
+
+    baseline = best_of(lambda: gila.get(KEY), number=20000)
+    report('gila.get', baseline)
+    handle = gila.key(KEY)
+    gila.enable_cache()
+    report('gila.get, cached', best_of(lambda: gila.get(KEY),
+                                       number=20000), baseline)
+    report('handle.get', best_of(handle.get, number=20000), baseline)
+    settings = Settings()
+    report('attribute lookup', best_of(lambda: settings.pool_size,
+                                       number=20000), baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Compares the time and peak memory of reading a large JSON config file and
+looking up a few keys in it, parsed in full and read lazily.
+
+Each step runs in a fresh process, so that peak RSS only covers that one
+read. A forked process starts out with the peak RSS of its parent, so the
+parent never builds the config itself.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+REGIONS = 60
+SERVICES = 200
+ROUTES = 40
+LOOKUPS = ['region3.service7', 'region11.service150.routes']
+
+
+def routing_config():
+    return {
+        f'region{region}': {
+            f'service{service}': {
+                'routes': [{'path': f'/api/v1/route{route}',
+                            'upstream': f'10.{region}.{service}.{route}',
+                            'weight': route / ROUTES,
+                            'retries': route % 3}
+                           for route in range(ROUTES)],
+                'timeout': 30,
+            }
+            for service in range(SERVICES)
+        }
+        for region in range(REGIONS)
+    }
+
+
+def generate(filepath: str):
+    with open(filepath, 'w') as json_file:
+        json.dump(routing_config(), json_file)
+
+
+def measure(filepath: str, lazy: bool):
+    from gila import Gila
+    start = perf_counter()
+    gila = Gila()
+    gila.set_config_file(filepath)
+    gila.read_config_file(lazy=lazy)
+    for key in LOOKUPS:
+        assert gila.get(key) is not None
+    seconds = perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': seconds, 'peak_kb': peak}))
+
+
+def run(filepath: str, mode: str):
+    output = subprocess.run([sys.executable, __file__, filepath, mode],
+                            stdout=subprocess.PIPE, check=True).stdout
+    return json.loads(output) if output else None
+
+
+def main():
+    with TemporaryDirectory() as tempdir:
+        filepath = os.path.join(tempdir, 'routes.json')
+        run(filepath, 'generate')
+        size = os.path.getsize(filepath)
+        print(f'{size / 2 ** 20:.0f}MB of JSON, {len(LOOKUPS)} lookups')
+        for mode in ('eager', 'lazy'):
+            result = run(filepath, mode)
+            print(f'{mode:<48} {result["seconds"] * 1e3:>12.3f} ms'
+                  f'  {result["peak_kb"] / 1024:>8.1f} MB peak RSS')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[2] == 'generate':
+        generate(sys.argv[1])
+    elif len(sys.argv) == 3:
+        measure(sys.argv[1], sys.argv[2] == 'lazy')
+    else:
+        main()
@@ -0,0 +1,72 @@
+"""
+Compares deep merging a small override into large configs, and two
+configs that differ everywhere, with gila's structural sharing deep merge,
+a naive deep merge that copies both inputs, and the old shallow merge.
+"""
+import tracemalloc
+from copy import deepcopy
+
+from gila.util.helpers import deep_merge, dict_merge
+from common import best_of, report
+from synthetic import leaf_keys, nested_config
+
+KEYS = 50000
+OVERRIDES = 10
+
+
+def naive_deep_merge(dict_1: dict, dict_2: dict):
+    merged = deepcopy(dict_2)
+    for key, value in dict_1.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = naive_deep_merge(value, merged[key])
+        else:
+            merged[key] = deepcopy(value)
+    return merged
+
+
+def override_for(keys: list):
+    override = {}
+    for key in keys:
+        path = key.split('.')
+        to_set = override
+        for item in path[0:-1]:
+            to_set = to_set.setdefault(item, {})
+        to_set[path[-1]] = 'overridden'
+    return override
+
+
+def allocated(func):
+    # Bytes still allocated by the result of func
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def compare(name: str, dict_1: dict, dict_2: dict):
+    merges = [('naive', naive_deep_merge), ('shared', deep_merge),
+              ('shallow', dict_merge)]
+    baseline = None
+    for merge_name, merge in merges:
+        seconds = best_of(lambda: merge(dict_1, dict_2), number=1, repeat=3)
+        size = allocated(lambda: merge(dict_1, dict_2))
+        report(f'{name}, {merge_name} ({size / 1024:.0f}KB kept)',
+               seconds, baseline)
+        baseline = baseline or seconds
+
+
+def main():
+    for depth in (2, 8):
+        config = nested_config(KEYS, depth)
+        keys = leaf_keys(KEYS, depth)
+        print(f'{KEYS} keys, {depth} levels deep')
+        step = len(keys) // OVERRIDES
+        compare(f'{OVERRIDES} overrides', override_for(keys[::step]),
+                config)
+        compare('every key overridden', override_for(keys), config)
+
+
+if __name__ == '__main__':
+    main()
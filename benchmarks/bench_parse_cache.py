@@ -0,0 +1,45 @@
+"""
+Compares parsing a config file with loading it from the on-disk parse
+cache, for each supported format.
+"""
+import os
+from tempfile import TemporaryDirectory
+
+from gila import Gila
+from common import best_of, report
+from synthetic import FORMATS, nested_config, write_config
+
+KEYS = 5000
+DEPTH = 3
+
+
+def read(filepath: str, cache_dir: str = None):
+    gila = Gila()
+    if cache_dir:
+        gila.enable_parse_cache(cache_dir)
+    gila.set_config_file(filepath)
+    gila.read_config_file()
+    return gila
+
+
+def main():
+    config = nested_config(KEYS, DEPTH)
+    print(f'{KEYS} keys, {DEPTH} levels deep')
+    with TemporaryDirectory() as tempdir:
+        cache_dir = os.path.join(tempdir, 'cache')
+        for extension in FORMATS:
+            filepath = os.path.join(tempdir, f'config{extension}')
+            write_config(config, filepath)
+            # Populate the cache
+            read(filepath, cache_dir)
+            number = 1 if extension in ('.toml', '.hcl') else 3
+            baseline = best_of(lambda: read(filepath), number=number,
+                               repeat=3)
+            report(f'{extension} parse', baseline)
+            report(f'{extension} cached', best_of(
+                lambda: read(filepath, cache_dir), number=number, repeat=3),
+                baseline)
+
+
+if __name__ == '__main__':
+    main()
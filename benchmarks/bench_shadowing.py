@@ -0,0 +1,49 @@
+"""
+Measures looking up deep keys that fall through every layer to their
+defaults, so that each lookup checks whether any parent of the key is
+shadowed in the overrides, automatic env, bound env and config layers.
+"""
+import os
+from tempfile import TemporaryDirectory
+
+from gila import Gila
+from common import best_of, report
+from synthetic import leaf_keys, nested_config, write_config
+
+KEYS = 5000
+DEPTHS = [4, 16, 32]
+
+
+def build(config_dir: str, depth: int):
+    config_file = os.path.join(config_dir, f'config{depth}.json')
+    write_config(nested_config(KEYS, depth), config_file)
+    gila = Gila()
+    gila.set_config_file(config_file)
+    gila.read_config_file()
+    # Siblings of the looked up key in the bound env and config layers, so
+    # that their shadow checks walk most of the way down the key
+    keys = leaf_keys(KEYS, depth)
+    for index, key in enumerate(keys[0:100]):
+        gila.bind_env(key, key.upper().replace('.', '_'))
+        gila.override(f'overridden{index}', 'override')
+    key = f'{keys[0]}_missing.leaf'
+    gila.set_default(key, 'default')
+    gila.set_env_prefix('BENCH')
+    gila.automatic_env()
+    return gila, key
+
+
+def main():
+    with TemporaryDirectory() as config_dir:
+        for depth in DEPTHS:
+            gila, key = build(config_dir, depth)
+            assert gila.get(key) == 'default'
+            report(f'gila.get, depth {depth + 1}, live env',
+                   best_of(lambda: gila.get(key), number=2000))
+            gila.snapshot_env()
+            report(f'gila.get, depth {depth + 1}, env snapshot',
+                   best_of(lambda: gila.get(key), number=2000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Compares prefork workers that each read the config file themselves with
+workers that attach to a snapshot published to shared memory by their
+master: the memory each worker adds, the time it takes to start reading
+the config, and the cost of a lookup.
+
+Workers walk a list of keys inherited from the benchmark, which makes
+them copy the pages holding it, so that is measured on its own too.
+"""
+import os
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from gila import Gila, SharedSnapshot
+from common import best_of, in_workers, report
+from synthetic import leaf_keys, nested_config, write_config
+
+KEYS = 50000
+DEPTH = 3
+WORKERS = 8
+
+
+def main():
+    keys = leaf_keys(KEYS, DEPTH)
+    print(f'{KEYS} keys, {DEPTH} levels deep, {WORKERS} workers')
+    with TemporaryDirectory() as tempdir:
+        config_file = os.path.join(tempdir, 'config.json')
+        write_config(nested_config(KEYS, DEPTH), config_file)
+        path = os.path.join('/dev/shm' if os.path.isdir('/dev/shm')
+                            else tempdir, f'gila-bench-{os.getpid()}')
+
+        def walk():
+            for key in keys:
+                pass
+
+        def parse():
+            gila = Gila()
+            gila.set_config_file(config_file)
+            gila.read_config_file()
+            for key in keys:
+                gila.get(key)
+            return gila
+
+        def attach():
+            shared = SharedSnapshot(path)
+            for key in keys:
+                shared.get(key)
+            return shared
+
+        master = Gila()
+        master.set_config_file(config_file)
+        master.read_config_file()
+        start = perf_counter()
+        master.publish_snapshot(path)
+        report('publish_snapshot', perf_counter() - start)
+        try:
+            for name, work in (('walk the keys only', walk),
+                               ('parse per worker', parse),
+                               ('shared snapshot', attach)):
+                added = in_workers(work, WORKERS) / 1024
+                print(f'{name:<48} {added:>12.1f} MB per worker')
+            report('read_config_file and get every key',
+                   best_of(parse, number=1, repeat=3))
+            report('SharedSnapshot and get every key',
+                   best_of(lambda: attach().close(), number=1, repeat=3))
+
+            shared = SharedSnapshot(path)
+            snapshot = master.snapshot()
+            key = keys[-1]
+            baseline = best_of(lambda: snapshot.get(key), number=20000)
+            report('Snapshot.get', baseline)
+            report('SharedSnapshot.get', best_of(lambda: shared.get(key),
+                                                 number=20000), baseline)
+            shared.close()
+        finally:
+            for leftover in (path, f'{path}.1'):
+                os.remove(leftover)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""
+Measures what recording lookup statistics adds to gila.get, for a key
+resolved from the config layer and for a miss.
+"""
+from gila import Gila
+from common import best_of, report
+
+
+def main():
+    gila = Gila()
+    gila.set_default('database.primary.host', 'localhost')
+    gila.automatic_env()
+    for key in ('database.primary.host', 'database.primary.missing'):
+        baseline = best_of(lambda: gila.get(key), number=20000)
+        report(f'gila.get {key}', baseline)
+        gila.enable_stats()
+        report(f'gila.get {key}, stats enabled',
+               best_of(lambda: gila.get(key), number=20000), baseline)
+        gila.disable_stats()
+
+
+if __name__ == '__main__':
+    main()
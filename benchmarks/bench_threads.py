@@ -0,0 +1,86 @@
+"""
+Measures gila.get throughput from 1, 4, 16 and 64 threads while another
+thread keeps reloading the config file, with thread safety enabled.
+"""
+import json
+import os
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import perf_counter, sleep
+
+from gila import Gila
+
+THREAD_COUNTS = [1, 4, 16, 64]
+DURATION = 1.0
+MIN_RELOADS = 5
+RELOAD_INTERVAL = 0.005
+SECTIONS = 50
+
+
+def build(config_dir: str):
+    config = {f'section{section}': {'nested': {'key': section}}
+              for section in range(SECTIONS)}
+    config_file = os.path.join(config_dir, 'config.json')
+    with open(config_file, 'w') as json_config:
+        json.dump(config, json_config)
+
+    gila = Gila()
+    gila.enable_thread_safety()
+    gila.set_config_file(config_file)
+    gila.read_config_file()
+    return gila
+
+
+def run(gila: Gila, threads: int, keys: list):
+    stop = Event()
+    counts = [0] * threads
+    reloads = [0]
+
+    def read(worker: int):
+        count = 0
+        while not stop.is_set():
+            for key in keys:
+                gila.get(key)
+            count += len(keys)
+        counts[worker] = count
+
+    def reload():
+        while not stop.is_set():
+            gila.read_config_file()
+            reloads[0] += 1
+            sleep(RELOAD_INTERVAL)
+
+    workers = [Thread(target=read, args=(worker,))
+               for worker in range(threads)]
+    workers.append(Thread(target=reload))
+    start = perf_counter()
+    for worker in workers:
+        worker.start()
+    sleep(DURATION)
+    while reloads[0] < MIN_RELOADS:
+        # With many readers the reloading thread rarely gets the GIL, so
+        # keep going until it has reloaded a few times
+        sleep(RELOAD_INTERVAL)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    elapsed = perf_counter() - start
+    return sum(counts) / elapsed, reloads[0]
+
+
+def main():
+    with TemporaryDirectory() as config_dir:
+        gila = build(config_dir)
+        keys = [f'section{section}.nested.key' for section in range(SECTIONS)]
+        for cached in (False, True):
+            if cached:
+                gila.enable_cache()
+            print(f'resolution cache {"on" if cached else "off"}')
+            for threads in THREAD_COUNTS:
+                gets, reloads = run(gila, threads, keys)
+                print(f'{threads:>4} threads {gets:>14,.0f} gets/s '
+                      f'{reloads:>6} reloads')
+
+
+if __name__ == '__main__':
+    main()
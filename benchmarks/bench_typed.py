@@ -0,0 +1,32 @@
+"""
+Compares converting string values on every lookup with the typed
+accessors, which only convert a value again once it has changed.
+"""
+from gila import Gila
+from gila.util.helpers import to_bool, to_duration
+from common import best_of, report
+
+
+def main():
+    gila = Gila()
+    gila.enable_cache()
+    gila.set_default('pool.size', '32')
+    gila.set_default('debug', 'true')
+    gila.set_default('request.timeout', '1m30s')
+    checks = [
+        ('int', lambda: int(gila.get('pool.size')),
+         lambda: gila.get_int('pool.size')),
+        ('bool', lambda: to_bool(gila.get('debug')),
+         lambda: gila.get_bool('debug')),
+        ('duration', lambda: to_duration(gila.get('request.timeout')),
+         lambda: gila.get_duration('request.timeout')),
+    ]
+    for name, convert, accessor in checks:
+        baseline = best_of(convert, number=20000)
+        report(f'{name}, converted per call', baseline)
+        report(f'{name}, typed accessor', best_of(accessor, number=20000),
+               baseline)
+
+
+if __name__ == '__main__':
+    main()
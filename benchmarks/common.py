@@ -0,0 +1,87 @@
+"""
+Timing and memory helpers shared by the gila benchmarks
+"""
+import os
+from timeit import Timer
+from typing import Callable
+
+
+def best_of(func: Callable, number: int = 1000, repeat: int = 5):
+    """
+    Returns the best time in seconds for a single call of func, out of
+    repeat runs of number calls each.
+
+    :param func: :py:class:`~typing.Callable` - function to time
+    :param number: :py:class:`int` - calls per run
+    :param repeat: :py:class:`int` - runs to take the best of
+    """
+    timer = Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(name: str, seconds: float, baseline: float = None):
+    """
+    Prints a single benchmark result, with the speedup over baseline if
+    one is given.
+
+    :param name: :py:class:`str` - name of the measurement
+    :param seconds: :py:class:`float` - time per call in seconds
+    :param baseline: :py:class:`float` - time per call to compare with
+    """
+    if seconds >= 1e-3:
+        line = f'{name:<48} {seconds * 1e3:>12.3f} ms'
+    else:
+        line = f'{name:<48} {seconds * 1e6:>12.3f} us'
+    if baseline:
+        line += f'  ({baseline / seconds:.2f}x)'
+    print(line)
+
+
+def private_kb():
+    """
+    Returns the kilobytes of memory only this process uses, ie. that it
+    doesn't share with any other process. Only works on Linux.
+    """
+    total = 0
+    with open('/proc/self/smaps_rollup') as smaps:
+        for line in smaps:
+            if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                total += int(line.split()[1])
+    return total
+
+
+def in_workers(work: Callable, workers: int):
+    """
+    Forks workers processes which all run work, and returns the mean
+    kilobytes of private memory that work added in each of them. The
+    workers are measured once all of them have run work, so pages they
+    all touched count as shared.
+
+    :param work: :py:class:`~typing.Callable` - function to run in each
+    :param workers: :py:class:`int` - number of workers to fork
+    """
+    results_read, results_write = os.pipe()
+    release_read, release_write = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            before = private_kb()
+            work()
+            # Wait for the others to map the same pages before measuring
+            os.write(results_write, b'.')
+            os.read(release_read, 1)
+            os.write(results_write, f'{private_kb() - before}\n'.encode())
+            os._exit(0)
+        pids.append(pid)
+    for _ in range(workers):
+        os.read(results_read, 1)
+    os.write(release_write, b'.' * workers)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    os.close(results_write)
+    with os.fdopen(results_read) as results:
+        lines = results.read().split()
+    os.close(release_read)
+    os.close(release_write)
+    return sum(int(added) for added in lines) / workers
@@ -0,0 +1,162 @@
+"""
+Runs the hot paths of gila over synthetic configs of several sizes, depths
+and formats: gila.get from each layer and for misses, all_config,
+read_config_file, override_with_env and alias resolution.
+
+Results can be saved as JSON with --save, and a later run can be compared
+against them with --compare, eg. to compare two commits:
+::
+
+    git checkout main
+    PYTHONPATH=. python benchmarks/suite.py --save main.json
+    git checkout my-branch
+    PYTHONPATH=. python benchmarks/suite.py --compare main.json
+"""
+import argparse
+import json
+import os
+import platform
+from tempfile import TemporaryDirectory
+
+from gila import Gila
+from common import best_of, report
+from synthetic import FORMATS, leaf_keys, nested_config, write_config
+
+SIZES = [1000, 10000]
+DEPTHS = [3, 8]
+ENV_PREFIX = 'SUITE'
+ENV_OVERRIDES = 100
+
+
+class Suite():
+    """
+    Collects the result of each measurement, and prints it next to the
+    result of the same measurement in a previous run if there is one.
+
+    :param previous: :py:class:`dict` - results of a previous run by name
+    """
+
+    def __init__(self, previous: dict = None):
+        self.results = {}
+        self.previous = previous or {}
+
+    def measure(self, name: str, func, number: int, repeat: int = 5):
+        seconds = best_of(func, number=number, repeat=repeat)
+        self.results[name] = seconds
+        report(name, seconds, self.previous.get(name))
+
+
+def build(config_file: str, keys: list):
+    # A store with a key in every layer, and an alias to a config key
+    gila = Gila()
+    gila.set_config_file(config_file)
+    gila.read_config_file()
+    gila.set_default('suite.default', 'default')
+    gila.override('suite_override', 'override')
+    os.environ[f'{ENV_PREFIX}_AUTO'] = 'auto'
+    os.environ['SUITE_BOUND_VAR'] = 'bound'
+    gila.set_env_prefix(ENV_PREFIX)
+    gila.bind_env('suite_bound', 'SUITE_BOUND_VAR')
+    gila.automatic_env()
+    gila.register_alias('suite_alias', keys[-1])
+    gila.register_alias('suite_alias_chain', 'suite_alias')
+    return gila
+
+
+def bench_lookups(suite: Suite, tempdir: str, size: int, depth: int):
+    keys = leaf_keys(size, depth)
+    config_file = os.path.join(tempdir, f'lookup-{size}-{depth}.json')
+    write_config(nested_config(size, depth), config_file)
+    gila = build(config_file, keys)
+    config_key = keys[-1]
+    lookups = [
+        ('override', 'suite_override'),
+        ('automatic env', 'auto'),
+        ('bound env', 'suite_bound'),
+        ('config', config_key),
+        ('default', 'suite.default'),
+        ('alias', 'suite_alias'),
+        ('alias chain', 'suite_alias_chain'),
+        ('miss', 'suite.missing'),
+        ('miss under config', f'{config_key}_missing.leaf'),
+    ]
+    label = f'{size} keys, depth {depth}'
+    for name, key in lookups:
+        suite.measure(f'get {name}, {label}', lambda: gila.get(key),
+                      number=5000)
+    gila.snapshot_env()
+    for name, key in lookups[1:3]:
+        suite.measure(f'get {name} from snapshot, {label}',
+                      lambda: gila.get(key), number=5000)
+
+    suite.measure(f'all_config, {label}', gila.all_config, number=100)
+
+    def all_config_after_override():
+        gila.override(config_key, 'changed')
+        return gila.all_config()
+
+    suite.measure(f'all_config after override, {label}',
+                  all_config_after_override, number=10, repeat=3)
+
+
+def bench_reads(suite: Suite, tempdir: str, size: int, depth: int):
+    config = nested_config(size, depth)
+    for extension in FORMATS:
+        config_file = os.path.join(tempdir, f'read-{size}-{depth}'
+                                            f'{extension}')
+        write_config(config, config_file)
+        gila = Gila()
+        gila.set_config_file(config_file)
+        suite.measure(
+            f'read_config_file {extension}, {size} keys, depth {depth}',
+            gila.read_config_file, number=1, repeat=3)
+
+
+def bench_override_with_env(suite: Suite):
+    names = [f'{ENV_PREFIX}_OVERRIDE_{index}'
+             for index in range(ENV_OVERRIDES)]
+    for name in names:
+        os.environ[name] = 'value'
+    try:
+        gila = Gila()
+        suite.measure(f'override_with_env, {ENV_OVERRIDES} vars',
+                      lambda: gila.override_with_env(ENV_PREFIX),
+                      number=10, repeat=3)
+    finally:
+        for name in names:
+            del os.environ[name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='numbers of keys in the synthetic configs, eg. '
+                             '1000 10000 100000 1000000')
+    parser.add_argument('--depths', type=int, nargs='+', default=DEPTHS,
+                        help='levels of nesting in the synthetic configs')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare',
+                        help='JSON file of a previous run to compare with')
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as compare_file:
+            previous = json.load(compare_file)['results']
+    suite = Suite(previous)
+    with TemporaryDirectory() as tempdir:
+        for size in args.sizes:
+            for depth in args.depths:
+                bench_lookups(suite, tempdir, size, depth)
+                bench_reads(suite, tempdir, size, depth)
+    bench_override_with_env(suite)
+
+    if args.save:
+        with open(args.save, 'w') as save_file:
+            json.dump({'python': platform.python_version(),
+                       'sizes': args.sizes, 'depths': args.depths,
+                       'results': suite.results}, save_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
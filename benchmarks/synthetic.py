@@ -0,0 +1,106 @@
+"""
+Generates synthetic configs of a given size and depth, and writes them out
+in each of the formats gila supports
+"""
+import json
+import os
+from math import ceil
+
+import toml
+import yaml
+
+FORMATS = ['.yaml', '.toml', '.json', '.hcl', '.properties', '.env']
+
+
+def leaf_keys(keys: int, depth: int):
+    """
+    Returns keys dotted paths, each depth elements long, spread evenly over
+    the levels of the tree.
+
+    :param keys: :py:class:`int` - number of leaf keys
+    :param depth: :py:class:`int` - number of elements in each key
+    """
+    branching = max(2, ceil(keys ** (1 / depth)))
+    paths = []
+    for number in range(keys):
+        path = []
+        for level in range(depth):
+            number, digit = divmod(number, branching)
+            path.append(f'level{depth - level}_{digit}')
+        paths.append('.'.join(reversed(path)))
+    return paths
+
+
+def value_for(index: int):
+    """
+    Returns a value of a type that rotates with index.
+
+    :param index: :py:class:`int` - index of the key
+    """
+    return [index, f'value{index}', index % 2 == 0, index / 7][index % 4]
+
+
+def nested_config(keys: int, depth: int):
+    """
+    Returns a nested config with keys leaves, depth levels deep.
+
+    :param keys: :py:class:`int` - number of leaf keys
+    :param depth: :py:class:`int` - number of levels
+    """
+    config = {}
+    for index, key in enumerate(leaf_keys(keys, depth)):
+        path = key.split('.')
+        to_set = config
+        for item in path[0:-1]:
+            to_set = to_set.setdefault(item, {})
+        to_set[path[-1]] = value_for(index)
+    return config
+
+
+def _flatten(config: dict, prefix: str = ''):
+    for key, value in config.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f'{prefix}{key}.')
+        else:
+            yield f'{prefix}{key}', value
+
+
+def _hcl(config: dict, indent: str = ''):
+    lines = []
+    for key, value in config.items():
+        if isinstance(value, dict):
+            lines.append(f'{indent}{key} {{')
+            lines.extend(_hcl(value, indent + '  '))
+            lines.append(f'{indent}}}')
+        else:
+            lines.append(f'{indent}{key} = {json.dumps(value)}')
+    return lines
+
+
+def write_config(config: dict, filepath: str):
+    """
+    Writes config to filepath, in the format given by its extension.
+
+    :param config: :py:class:`dict` - config to write
+    :param filepath: :py:class:`str` - file to write, with an extension
+        from FORMATS
+    """
+    _, extension = os.path.splitext(filepath)
+    with open(filepath, 'w') as config_file:
+        if extension == '.yaml':
+            yaml.safe_dump(config, config_file)
+        elif extension == '.toml':
+            toml.dump(config, config_file)
+        elif extension == '.json':
+            json.dump(config, config_file)
+        elif extension == '.hcl':
+            config_file.write('\n'.join(_hcl(config)))
+        elif extension == '.properties':
+            for key, value in _flatten(config):
+                config_file.write(f'{key}={value}\n')
+        elif extension == '.env':
+            for key, value in _flatten(config):
+                env_key = key.upper().replace('.', '_')
+                config_file.write(f'{env_key}={value}\n')
+        else:
+            raise ValueError(f'Unsupported format {extension}')
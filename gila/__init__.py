@@ -1,2 +1,15 @@
 # flake8: noqa
+import sys
+
 from .gila import *
+
+if sys.version_info < (3, 7):
+    from .shared import SharedSnapshot
+else:
+    def __getattr__(name):
+        # Imported on first use, as only the workers of prefork servers
+        # need it
+        if name == 'SharedSnapshot':
+            from .shared import SharedSnapshot
+            return SharedSnapshot
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
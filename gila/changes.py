@@ -0,0 +1,70 @@
+"""
+Change notifications of a Gila config store for asyncio applications
+"""
+from typing import Callable
+
+
+class ConfigChanges():
+    """
+    An async iterator of the changes to the config files of a config
+    store, created with gila.config_changes(). Yields the name of each
+    config source read in, ie. the path of a config file or the sources
+    given to gila.read_config_files(), and its :py:class:`ConfigDiff`, eg.
+    ::
+
+        changes = gila.config_changes()
+        gila.watch_config()
+        async for filename, diff in changes:
+            if "database.host" in diff.changed:
+                await reconnect()
+
+    Changes are collected from the moment the iterator is created, from
+    whichever thread read the config in, and are delivered on the event
+    loop that created it. Call close() to stop collecting them, which
+    also ends any iteration in progress.
+    """
+
+    def __init__(self, subscribe: Callable, unsubscribe: Callable):
+        # Imported here, as only asyncio applications need it
+        import asyncio
+        self.__loop = asyncio.get_event_loop()
+        self.__queue = asyncio.Queue()
+        self.__unsubscribe = unsubscribe
+        self.__closed = False
+        self.__ended = False
+        subscribe(self.__on_change)
+
+    def __on_change(self, name, diff):
+        try:
+            self.__loop.call_soon_threadsafe(self.__queue.put_nowait,
+                                             (name, diff))
+        except RuntimeError:
+            # The event loop is closed, so nothing is listening
+            self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.__ended:
+            raise StopAsyncIteration
+        change = await self.__queue.get()
+        if change is None:
+            # close() queues None behind the changes collected before it
+            self.__ended = True
+            raise StopAsyncIteration
+        return change
+
+    def close(self):
+        """
+        Stops collecting changes. Changes already collected are still
+        yielded before the iteration ends.
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__unsubscribe(self.__on_change)
+        try:
+            self.__loop.call_soon_threadsafe(self.__queue.put_nowait, None)
+        except RuntimeError:
+            pass
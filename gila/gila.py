@@ -27,14 +27,30 @@ instance back to empty.
 .. _Viper: https://github.com/spf13/viper
 .. _12Factor: https://12factor.net/
 """
-from typing import List, Any
+from collections import namedtuple
+from functools import wraps
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, List, Set
 from .util.errors import (ConfigNotSupported, ConfigFileNotFound,
-                          CircularReference)
+                          CircularReference, InvalidConfigValue)
 from .util.helpers import (deep_search, yaml_to_dict, prop_to_dict,
                            json_to_dict, toml_to_dict, hcl_to_dict,
-                           dict_merge, env_to_dict)
+                           deep_merge, env_to_dict,
+                           flatten_dict, deep_freeze, diff_flat_dicts,
+                           intern_keys,
+                           to_int, to_float, to_bool, to_duration, to_list)
+from .util.locks import StampedLock, NoLock
+from .util.parse_cache import ParseCache
+from .util.trie import KeyTrie, shadowing_parent
+from .util.stats import StatsRecorder, LookupStats
+from .snapshot import Snapshot
+from .handle import KeyCell, KeyHandle
+from .changes import ConfigChanges
 from os import path as os_path
 from os import environ as os_env
+from os import cpu_count, scandir, stat
+from sys import intern
+from time import perf_counter, time
 
 _supported_exts = [
     ".yaml", ".yml",
@@ -44,14 +60,43 @@ _supported_exts = [
     ".properties", ".props", ".prop",
     ".env",
     ]
+_config_types = {
+    ".yaml": (".yaml", yaml_to_dict),
+    ".yml": (".yaml", yaml_to_dict),
+    ".toml": (".toml", toml_to_dict),
+    ".json": (".json", json_to_dict),
+    ".hcl": (".hcl", hcl_to_dict),
+    ".properties": (".properties", prop_to_dict),
+    ".props": (".properties", prop_to_dict),
+    ".prop": (".properties", prop_to_dict),
+    ".env": (".env", env_to_dict),
+    }
 _key_delim = "."
 _allowed_falsy_values = ([], (), {}, set(), '', range(0), 0, 0.0, 0j, False)
+_no_lock = NoLock()
+# Directory -> (modification time, names of the files in it)
+_dir_listings = {}
+# Seconds within which a directory's modification time may not yet
+# reflect every change, on filesystems with coarse timestamps
+_racy_mtime_window = 2
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'size', 'generation'])
+Explanation = namedtuple('Explanation', ['key', 'real_key', 'value', 'layer',
+                                         'steps', 'seconds'])
+TraceStep = namedtuple('TraceStep', ['layer', 'found', 'value', 'shadowed_by',
+                                     'seconds'])
+ConfigDiff = namedtuple('ConfigDiff', ['added', 'removed', 'changed'])
 
 __all__ = [
     "ConfigNotSupported",
     "ConfigFileNotFound",
     "CircularReference",
+    "InvalidConfigValue",
     "Gila",
+    "Snapshot",
+    "KeyHandle",
+    "ConfigChanges",
+    "ConfigDiff",
     "reset",
     "automatic_env",
     "set_config_type",
@@ -62,34 +107,82 @@ __all__ = [
     "is_set",
     "in_config",
     "set_default",
+    "remove_default",
     "unbind_env",
     "bind_env",
     "override_with_env",
+    "snapshot_env",
+    "refresh_env",
     "register_alias",
     "deregister_alias",
     "override",
     "remove_override",
     "read_config_file",
+    "read_config_files",
+    "aread_config_file",
+    "config_changes",
+    "enable_parse_cache",
+    "disable_parse_cache",
+    "watch_config",
+    "unwatch_config",
     "get",
+    "get_many",
+    "explain",
+    "key",
+    "get_int",
+    "get_float",
+    "get_bool",
+    "get_duration",
+    "get_list",
+    "snapshot",
+    "publish_snapshot",
+    "enable_cache",
+    "disable_cache",
+    "cache_info",
+    "enable_stats",
+    "disable_stats",
+    "stats",
+    "reset_stats",
+    "enable_thread_safety",
+    "prepare_for_fork",
     "debug",
     "all_config"
 ]
 
 
+def _writes(method):
+    # Runs a method of Gila that changes the config store under the write
+    # lock, when thread safety is enabled
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._Gila__writing():
+            return method(self, *args, **kwargs)
+    return locked
+
+
 class Gila():
     """
     An instance of the Gila config store
     """
 
     def __init__(self):
+        self.__generation = 0
+        self.__lock = None
+        self.__watcher = None
+        # Kept through reset(), so that existing key handles and change
+        # iterators see it
+        self.__cells = {}
+        self.__listeners = ()
         self.reset()
 
+    @_writes
     def reset(self):
         """
         Resets all of the values in the singleton instance of Gila
         """
         global _supported_exts
         global _key_delim
+        self.unwatch_config()
         self.__supported_exts = _supported_exts
         self.__key_delim = _key_delim
         self.__config_paths = []
@@ -98,15 +191,45 @@ class Gila():
         self.__config_type = None
         self.__config_file = None
         self.__config_resolver = None
+        self.__parse_cache = None
         self.__env_prefix = None
         self.__allow_empty_env = True
         self.__aliases = {}
+        self.__resolved_aliases = {}
+        self.__alias_dependents = {}
+        self.__config_sources = {}
+        self.__lazy_sources = {}
         self.__config = {}
+        self.__config_index = {}
         self.__defaults = {}
         self.__overrides = {}
         self.__env = {}
+        self.__env_trie = KeyTrie(delim=self.__key_delim)
+        self.__environ = None
+        self.__auto_env = {}
+        self.__auto_env_trie = KeyTrie(delim=self.__key_delim)
+        self.__bound_env = {}
+        self.__cache_enabled = False
+        self.__cache = {}
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__stats = None
+        self.__coerced = {}
+        self.__merged = {}
+        self.__merged_stale = None
+        self.__changed()
 
     # Hidden methods for backend work, these are unexposed
+    def __writing(self):
+        if self.__lock is None:
+            return _no_lock.write()
+        return self.__lock.write()
+
+    def __reading(self, func: Callable, *args):
+        if self.__lock is None:
+            return func(*args)
+        return self.__lock.read(func, *args)
+
     def __get_config_file(self):
         if not self.__config_file:
             self.__config_file = self.__find_config_file()
@@ -121,9 +244,10 @@ class Gila():
         return self.__config_type
 
     def __search_in_path(self, filepath: str):
+        # One directory scan instead of a stat per supported extension
+        filenames = _list_dir(filepath)
         for ext in self.__supported_exts:
-            if os_path.exists(os_path.join(
-                    filepath, f'{self.__config_name}{ext}')):
+            if f'{self.__config_name}{ext}' in filenames:
                 self.set_config_type(ext)
                 return os_path.join(filepath, f'{self.__config_name}{ext}')
         return None
@@ -138,129 +262,341 @@ class Gila():
             raise ConfigFileNotFound(
                 f"Couldn't find config on paths: {self.__config_paths}")
 
+    def __changed(self, keys: Iterable[str] = None):
+        # Every mutator calls this to invalidate memoized lookups. keys are
+        # the dotted keys whose values changed, or None when anything might
+        # have changed.
+        self.__generation += 1
+        if keys is None:
+            # Swapped rather than cleared, so that a concurrent reader can
+            # only ever store a stale value in the cache being thrown away
+            self.__cache = {}
+            self.__coerced = {}
+            self.__merged_stale = None
+            for cell in self.__cells.values():
+                cell.valid = False
+            return
+        keys = set(keys)
+        delim = self.__key_delim
+        prefixes = set()
+        for key in keys:
+            path = key.split(delim)
+            for index in range(1, len(path) + 1):
+                prefixes.add(delim.join(path[0:index]))
+        self.__invalidate_cache(keys, prefixes)
+        if self.__merged_stale is not None:
+            # The merged view is refreshed a top-level key at a time, along
+            # with those of the aliases that resolve beneath them
+            tops = {self.__real_key(key).split(delim)[0] for key in keys}
+            self.__merged_stale.update(tops)
+            for alias, real_key in self.__resolved_aliases.items():
+                if real_key.split(delim)[0] in tops:
+                    self.__merged_stale.add(alias.split(delim)[0])
+
+    def __invalidate_cache(self, keys: Set[str], prefixes: Set[str]):
+        # A cached key is stale when a changed key is the same key, one of
+        # its parents (which could shadow it) or one of its children
+        if not self.__cache and not self.__coerced and not self.__cells:
+            return
+        delim = self.__key_delim
+
+        def is_stale(key: str):
+            key = self.__real_key(key)
+            if key in prefixes:
+                return True
+            path = key.split(delim)
+            return any(delim.join(path[0:index]) in keys
+                       for index in range(1, len(path)))
+
+        if len(keys) >= len(self.__cache) + len(self.__coerced):
+            self.__cache = {}
+            self.__coerced = {}
+        else:
+            # Lock-free readers keep inserting into the old dicts, so they
+            # are copied in a single call before being filtered into new
+            # ones, which are then swapped in
+            self.__cache = {
+                key: value for key, value in list(self.__cache.items())
+                if not is_stale(key)}
+            self.__coerced = {
+                key: value for key, value in list(self.__coerced.items())
+                if not is_stale(key)}
+        for key, cell in list(self.__cells.items()):
+            if cell.valid and is_stale(key):
+                cell.valid = False
+
+    def __config_layers(self):
+        # In reverse order of precedence
+        return [self.__defaults, self.__full_config(), self.__env,
+                self.__overrides]
+
+    def __full_config(self):
+        # The config files, with any lazily read ones parsed in full
+        if not self.__lazy_sources:
+            return self.__config
+        merged = {}
+        for lazy in self.__lazy_sources.values():
+            merged = deep_merge(lazy.materialize(), merged)
+        return deep_merge(self.__config, merged)
+
+    def __refresh_merged(self, top: str):
+        tree = self.__merge_tree(self.__layer_keys(top), top)
+        if top in tree:
+            self.__merged[top] = tree[top]
+        else:
+            self.__merged.pop(top, None)
+
+    def __rebuild_merged(self):
+        self.__merged = self.__merge_tree(self.__layer_keys())
+
+    def __layer_keys(self, top: str = None):
+        # The real keys that the layers hold values at, only those under
+        # the top-level key top if it is given
+        delim = self.__key_delim
+        overrides = self.__overrides
+        keys = set()
+        for layer in self.__config_layers():
+            for key, value in layer.items():
+                real_top = self.__real_key(key).split(delim)[0]
+                if top is not None and key.split(delim)[0] != top and \
+                        real_top != top:
+                    continue
+                if layer is not overrides and real_top in overrides:
+                    # An override shadows every key under its top-level key
+                    continue
+                keys.add(key)
+                if isinstance(value, dict):
+                    keys.update(f'{key}{delim}{child}'
+                                for child in flatten_dict(value, delim))
+        return {self.__real_key(key) for key in keys}
+
+    def __merge_tree(self, keys: Iterable[str], top: str = None):
+        # Nests what gila.get() resolves each of keys and their parents to,
+        # expanding the dictionaries it finds key by key, so that the tree
+        # agrees with gila.get() for every key in it
+        delim = self.__key_delim
+        children = {}
+        for key in keys:
+            path = key.split(delim)
+            children.setdefault(None, set()).add(path[0])
+            for index in range(1, len(path)):
+                children.setdefault(delim.join(path[0:index]), set()).add(
+                    path[index])
+        memo = {}
+
+        def merge(key: str):
+            value = self.__find(key, memo)
+            if value is None and key in children:
+                # Only spelled with dotted keys beneath it
+                value = {}
+            if not isinstance(value, dict):
+                return value
+            tree = {}
+            names = set(children.get(key, ()))
+            for name, child in value.items():
+                if isinstance(name, str):
+                    names.add(name)
+                else:
+                    # Can't be looked up, so kept as it is
+                    tree[name] = child
+            for name in names:
+                child = merge(f'{key}{delim}{name}')
+                if child is not None:
+                    tree[name] = child
+            return tree
+
+        tops = children.get(None, set())
+        if top is not None:
+            tops = tops & {top}
+        merged = {}
+        for name in tops:
+            value = merge(name)
+            if value is not None and (value != {} or name not in children):
+                merged[name] = value
+        return merged
+
+    def __refresh_env_maps(self):
+        # Precomputes what the automatic and bound env lookups would find in
+        # the environment snapshot, keyed by the config key they serve
+        if self.__environ is None:
+            return
+        if self.__env_prefix:
+            prefix = f'{self.__env_prefix.upper()}_'
+            self.__auto_env = {
+                name[len(prefix):]: value
+                for name, value in self.__environ.items()
+                if name.startswith(prefix)}
+        else:
+            self.__auto_env = self.__environ
+        self.__auto_env_trie = KeyTrie(
+            (name for name, value in self.__auto_env.items() if value),
+            self.__key_delim)
+        self.__bound_env = {
+            key: self.__environ[env_key]
+            for key, env_key in self.__env.items()
+            if env_key in self.__environ}
+
+    def __auto_env_keys(self):
+        # The keys automatic_env can currently resolve, in the casing of
+        # the env var and lowercased
+        if self.__environ is not None:
+            keys = list(self.__auto_env)
+        elif self.__env_prefix:
+            prefix = f'{self.__env_prefix.upper()}_'
+            keys = [name[len(prefix):] for name in os_env
+                    if name.startswith(prefix)]
+        else:
+            keys = list(os_env)
+        return keys + [key.lower() for key in keys]
+
     def __merge_with_env_prefix(self, merge: str):
         if not self.__env_prefix:
             return merge.upper()
         return f'{self.__env_prefix.upper()}_{merge.upper()}'
 
     def __search_dict(self, to_search: dict, path: List[str]):
-        # End case
-        if len(path) == 0:
-            return to_search
-        if path[0] in to_search:
-            # Fast return
-            if len(path) == 1:
-                return to_search[path[0]]
-
-            # Continue
-            if isinstance(to_search[path[0]], dict):
-                return self.__search_dict(to_search[path[0]], path[1:])
-
-            # Value received, dict expected
-            return None
-
-    # TODO: swap position of arguments to match other functions
-    def __search_dict_with_prefix(self, to_search: dict, path: List[str]):
-        if len(path) == 0:
-            return to_search
-
-        for index in range(len(path), 0, -1):
-            value = None
-            delim = self.__key_delim
-            key_prefix = delim.join(path[0:index])
-
-            if key_prefix in to_search:
-                if index == len(path):
-                    return to_search[key_prefix]
-                if isinstance(to_search[key_prefix], dict):
-                    value = self.__search_dict_with_prefix(
-                        to_search[key_prefix], path[index:])
-                if value:
-                    return value
-        return None
+        # Walks down path one level at a time, without copying it
+        for item in path:
+            if not isinstance(to_search, dict) or item not in to_search:
+                # Missing, or value received where a dict was expected
+                return None
+            to_search = to_search[item]
+        return to_search
 
     def __real_key(self, key: str):
         key = str(key)
-        if key in self.__aliases:
-            return self.__real_key(self.__aliases[key])
-        return key
-
-    def __is_path_shadowed_in_deep_dict(self, path: List[str], to_check: dict):
-        parent_val = None
-        for index, _ in enumerate(path):
-            parent_val = self.__search_dict(to_check, path[0:index])
-            if not parent_val:
-                return None
-            if isinstance(parent_val, dict):
-                continue
-            return self.__key_delim.join(path[0:index])
+        return self.__resolved_aliases.get(key, key)
+
+    def __is_path_shadowed_by_alias(self, path: List[str]):
+        # Keys nested under an alias are never resolved through it
+        return bool(self.__aliases.get(path[0]))
+
+    def __add_resolved_alias(self, alias: str, key: str):
+        real_key = self.__resolved_aliases.get(key, key)
+        # Aliases that resolved to alias as a real key now go through it
+        moved = self.__alias_dependents.pop(alias, set())
+        for dependent in moved:
+            self.__resolved_aliases[dependent] = real_key
+        moved.add(alias)
+        self.__resolved_aliases[alias] = real_key
+        self.__alias_dependents.setdefault(real_key, set()).update(moved)
+
+    def __resolve_aliases(self):
+        resolved = {}
+        dependents = {}
+        for alias in self.__aliases:
+            real_key = alias
+            while real_key in self.__aliases:
+                real_key = self.__aliases[real_key]
+            resolved[alias] = real_key
+            dependents.setdefault(real_key, set()).add(alias)
+        self.__resolved_aliases = resolved
+        self.__alias_dependents = dependents
+
+    def __is_path_shadowed_in_overrides(self, path: List[str]):
+        # An override shadows every key under its top-level key
+        if path[0] in self.__overrides:
+            return path[0]
         return None
 
-    def __is_path_shadowed_in_flat_dict(self, path: List[str], to_check: Any):
-        if not isinstance(to_check, dict):
-            return None
-        for index, _ in enumerate(path):
-            parent_key = self.__key_delim.join(path[0:index])
-            if parent_key in to_check:
-                return parent_key
-        return None
+    def __is_path_shadowed_in_config(self, path: List[str]):
+        return shadowing_parent(self.__config, path, self.__key_delim)
+
+    def __is_path_shadowed_in_env(self, path: List[str]):
+        return self.__env_trie.shadowing_parent(path)
 
     def __is_path_shadowed_in_auto_env(self, path: List[str]):
-        for index, _ in enumerate(path):
-            parent_key = self.__key_delim.join(path[0:index])
-            value = os_env.get(self.__merge_with_env_prefix(parent_key))
-            if value:
+        if self.__environ is not None:
+            return self.__auto_env_trie.shadowing_parent(
+                [segment.upper() for segment in path])
+        # The live environment can change at any time, so each parent is
+        # looked up, building its key up one segment at a time
+        parent_key = path[0]
+        for segment in path[1:]:
+            if os_env.get(self.__merge_with_env_prefix(parent_key)):
                 return parent_key
+            parent_key = f'{parent_key}{self.__key_delim}{segment}'
         return None
 
-    def __find(self, key: str):
-        found_value = None
+    @staticmethod
+    def __is_path_shadowed(shadows: dict, layer: str, check: Callable,
+                           path: List[str]):
+        # Shadowing only depends on the parent path, so keys looked up
+        # together under one parent share each layer's result in shadows
+        if shadows is None:
+            return check(path)
+        if layer not in shadows:
+            shadows[layer] = check(path)
+        return shadows[layer]
+
+    def __find(self, key: str, memo: dict = None):
+        # memo maps each parent key to the shadowing found for it in each
+        # layer, for callers looking up many keys at once
         path = key.split(self.__key_delim)
-        nested = len(path) > 1
 
-        path_shadow = self.__is_path_shadowed_in_deep_dict(
-            path, self.__aliases)
-        if nested and path_shadow:
+        if len(path) > 1 and self.__is_path_shadowed_by_alias(path):
             return None
 
         # Get real_key from aliases
         key = self.__real_key(key)
-        path = key.split(self.__key_delim)
+        shadows = None
+        if memo is not None:
+            parent = key.rpartition(self.__key_delim)[0]
+            if parent:
+                shadows = memo.get(parent)
+                if shadows is None:
+                    shadows = memo[parent] = {}
+        return self.__find_real(key, key.split(self.__key_delim), shadows)
+
+    def __find_real(self, key: str, path: List[str], shadows: dict = None,
+                    env_name: str = None):
+        # Searches the layers for a key already resolved through aliases
         nested = len(path) > 1
 
         # Search overrides
         found_value = self.__search_dict(self.__overrides, path)
         if found_value or found_value in _allowed_falsy_values:
             return found_value
-        path_shadow = self.__is_path_shadowed_in_flat_dict(
-            path, self.__overrides)
-        if nested and path_shadow:
+        if nested and self.__is_path_shadowed(
+                shadows, 'override', self.__is_path_shadowed_in_overrides,
+                path):
             return None
 
         # Search ENV vars
         if self.__automatic_env_applied:
-            value = os_env.get(self.__merge_with_env_prefix(key))
+            if self.__environ is None:
+                value = os_env.get(
+                    env_name or self.__merge_with_env_prefix(key))
+            else:
+                value = self.__auto_env.get(key.upper())
             if value or value in _allowed_falsy_values:
                 return value
-            path_shadow = self.__is_path_shadowed_in_auto_env(path)
-            if nested and path_shadow:
+            if nested and self.__is_path_shadowed(
+                    shadows, 'auto_env', self.__is_path_shadowed_in_auto_env,
+                    path):
                 return None
 
         if key in self.__env:
-            env_key = self.__env[key]
-            value = os_env.get(env_key)
+            if self.__environ is None:
+                value = os_env.get(self.__env[key])
+            else:
+                value = self.__bound_env.get(key)
             if value or value in _allowed_falsy_values:
                 return value
-        path_shadow = self.__is_path_shadowed_in_flat_dict(path, self.__env)
-        if nested and path_shadow:
+        if nested and self.__is_path_shadowed(
+                shadows, 'env', self.__is_path_shadowed_in_env, path):
             return None
 
         # Search Config vars
-        value = self.__search_dict_with_prefix(self.__config, path)
+        value = self.__config_index.get(key)
+        shadowed = nested and value is None and self.__is_path_shadowed(
+            shadows, 'config', self.__is_path_shadowed_in_config, path)
+        if self.__lazy_sources and not shadowed and (
+                value is None or isinstance(value, dict)):
+            value, shadowed = self.__search_lazy_sources(path, value)
         if value or value in _allowed_falsy_values:
             return value
-        path_shadow = self.__is_path_shadowed_in_deep_dict(path, self.__config)
-        if nested and path_shadow:
+        if shadowed:
             return None
 
         value = self.__search_dict(self.__defaults, path)
@@ -268,6 +604,98 @@ class Gila():
             return value
         return None
 
+    def __trace_find(self, key: str):
+        # The same search as __find, one layer at a time. Yields the layer,
+        # whether the key was found in it, the value found and the parent
+        # that shadows the key in that layer, if any. Stops after the layer
+        # that decides the lookup. The first step resolves aliases, with the
+        # real key as its value.
+        path = key.split(self.__key_delim)
+        if len(path) > 1 and self.__is_path_shadowed_by_alias(path):
+            yield 'alias', False, key, path[0]
+            return
+        key = self.__real_key(key)
+        yield 'alias', False, key, None
+        path = key.split(self.__key_delim)
+        nested = len(path) > 1
+
+        value = self.__search_dict(self.__overrides, path)
+        step = self.__trace_step('override', value, nested and (
+            lambda: self.__is_path_shadowed_in_overrides(path)))
+        yield step
+        if step[1] or step[3]:
+            return
+
+        if self.__automatic_env_applied:
+            if self.__environ is None:
+                value = os_env.get(self.__merge_with_env_prefix(key))
+            else:
+                value = self.__auto_env.get(key.upper())
+            step = self.__trace_step('auto_env', value, nested and (
+                lambda: self.__is_path_shadowed_in_auto_env(path)))
+            yield step
+            if step[1] or step[3]:
+                return
+
+        value = None
+        if key in self.__env:
+            if self.__environ is None:
+                value = os_env.get(self.__env[key])
+            else:
+                value = self.__bound_env.get(key)
+        step = self.__trace_step('bound_env', value, nested and (
+            lambda: self.__is_path_shadowed_in_env(path)))
+        yield step
+        if step[1] or step[3]:
+            return
+
+        value = self.__config_index.get(key)
+        shadowed = None
+        if nested and value is None:
+            shadowed = self.__is_path_shadowed_in_config(path)
+        if self.__lazy_sources and not shadowed and (
+                value is None or isinstance(value, dict)):
+            value, shadowed = self.__search_lazy_sources(path, value)
+        step = self.__trace_step('config', value, lambda: shadowed or None)
+        yield step
+        if step[1] or step[3]:
+            return
+
+        value = self.__search_dict(self.__defaults, path)
+        yield self.__trace_step('default', value, nested and (
+            lambda: shadowing_parent(self.__defaults, path,
+                                     self.__key_delim)))
+
+    @staticmethod
+    def __trace_step(layer: str, value: Any, shadowed_by: Callable):
+        if value or value in _allowed_falsy_values:
+            return layer, True, value, None
+        return layer, False, None, shadowed_by() if shadowed_by else None
+
+    def __find_layer(self, key: str):
+        # Returns the layer that resolves key, 'miss' if none does
+        for layer, found, _, _ in self.__trace_find(key):
+            if found:
+                return layer
+        return 'miss'
+
+    def __search_lazy_sources(self, path: List[str], found: Any):
+        # Lazily read config files sit below the others. Merges what they
+        # hold at path into found, as if they had been merged in up front.
+        for lazy in reversed(list(self.__lazy_sources.values())):
+            value, shadowed = lazy.resolve(path, self.__key_delim)
+            if value is None:
+                if shadowed:
+                    return found, found is None
+                continue
+            if found is None:
+                found = value
+            elif isinstance(found, dict) and isinstance(value, dict):
+                found = deep_merge(found, value)
+            if not isinstance(found, dict) or not isinstance(value, dict):
+                break
+        return found, False
+
     # These are the primary methods for retrieving values
     def get(self, key: str):
         """
@@ -280,8 +708,452 @@ class Gila():
         :param key: :py:class:`str`: The key to search the config store for
 
         """
+        if self.__stats is not None:
+            return self.__get_with_stats(key)
+        if self.__lock is not None:
+            return self.__lock.read(self.__get, key)
+        if self.__cache_enabled:
+            return self.__cached_find(key)
         return self.__find(key)
 
+    def __get_with_stats(self, key: str):
+        # Only the lookup itself is timed. The layer is found afterwards,
+        # by searching the layers again one at a time.
+        stats = self.__stats
+        start = perf_counter()
+        value = self.__reading(self.__get, key)
+        elapsed = perf_counter() - start
+        stats.record(key, self.__reading(self.__find_layer, key), elapsed)
+        return value
+
+    def __get(self, key: str):
+        if self.__cache_enabled:
+            return self.__cached_find(key)
+        return self.__find(key)
+
+    def key(self, key: str):
+        """
+        Returns a reusable :py:class:`KeyHandle` for key, whose get() method
+        returns what gila.get(key) would. The key is compiled once and its
+        value kept until a change affects it, so the handle is much cheaper
+        to call than gila.get(key) in hot loops.
+
+        :param key: :py:class:`str`: The key to make a handle for
+
+        """
+        with self.__writing():
+            cell = self.__cells.get(key)
+            if cell is None:
+                cell = self.__cells[key] = KeyCell(key)
+        return KeyHandle(key, cell, self.__resolve_cell)
+
+    def __resolve_cell(self, cell: KeyCell):
+        return self.__reading(self.__compile_cell, cell)
+
+    def __compile_cell(self, cell: KeyCell):
+        # Recompiled whenever the cell was invalidated, as aliases and the
+        # env prefix may have changed since
+        delim = self.__key_delim
+        cell.path = cell.key.split(delim)
+        cell.alias_shadowed = (
+            len(cell.path) > 1 and
+            self.__is_path_shadowed_by_alias(cell.path))
+        cell.real_key = self.__real_key(cell.key)
+        cell.real_path = cell.real_key.split(delim)
+        cell.env_name = self.__merge_with_env_prefix(cell.real_key)
+        if cell.alias_shadowed:
+            value = None
+        else:
+            value = self.__find_real(cell.real_key, cell.real_path,
+                                     env_name=cell.env_name)
+        # Values read live from os.environ can change without Gila knowing
+        if self.__cache_enabled or self.__environ is not None or not (
+                self.__automatic_env_applied or cell.real_key in self.__env):
+            cell.value = value
+            cell.valid = True
+        return value
+
+    def get_int(self, key: str):
+        """
+        Fetches the value for key like gila.get(key), converted to an
+        :py:class:`int`. Strings, such as values from env vars, are parsed
+        as base 10. Returns None if no value is found.
+
+        Raises :py:class:`InvalidConfigValue` if the value can't be
+        converted.
+
+        :param key: :py:class:`str`: The key to search the config store for
+
+        """
+        return self.__get_coerced(key, to_int)
+
+    def get_float(self, key: str):
+        """
+        Fetches the value for key like gila.get(key), converted to a
+        :py:class:`float`. Returns None if no value is found.
+
+        Raises :py:class:`InvalidConfigValue` if the value can't be
+        converted.
+
+        :param key: :py:class:`str`: The key to search the config store for
+
+        """
+        return self.__get_coerced(key, to_float)
+
+    def get_bool(self, key: str):
+        """
+        Fetches the value for key like gila.get(key), converted to a
+        :py:class:`bool`. Strings such as ``true``, ``yes``, ``on`` and
+        ``1`` or ``false``, ``no``, ``off`` and ``0`` are accepted in any
+        case. Returns None if no value is found.
+
+        Raises :py:class:`InvalidConfigValue` if the value can't be
+        converted.
+
+        :param key: :py:class:`str`: The key to search the config store for
+
+        """
+        return self.__get_coerced(key, to_bool)
+
+    def get_duration(self, key: str):
+        """
+        Fetches the value for key like gila.get(key), converted to a
+        :py:class:`~datetime.timedelta`. Numbers are taken as seconds, and
+        strings can also be Go style durations such as ``300ms`` or
+        ``1h30m``. Returns None if no value is found.
+
+        Raises :py:class:`InvalidConfigValue` if the value can't be
+        converted.
+
+        :param key: :py:class:`str`: The key to search the config store for
+
+        """
+        return self.__get_coerced(key, to_duration)
+
+    def get_list(self, key: str):
+        """
+        Fetches the value for key like gila.get(key), converted to a
+        :py:class:`list`. Strings are split on commas. Returns None if no
+        value is found.
+
+        Raises :py:class:`InvalidConfigValue` if the value can't be
+        converted.
+
+        :param key: :py:class:`str`: The key to search the config store for
+
+        """
+        value = self.__get_coerced(key, to_list)
+        # A copy, so that callers can't change the stored conversion
+        return None if value is None else list(value)
+
+    def __get_coerced(self, key: str, convert: Callable):
+        # The last conversion of each key is kept until the key changes, and
+        # is only used while the value it was made from is still the one
+        # found, eg. os.environ may have changed since
+        value = self.get(key)
+        if value is None:
+            return None
+        coerced = self.__coerced
+        stored = coerced.get(key)
+        if stored is not None and stored[0] is convert and (
+                stored[1] is value or (type(stored[1]) is type(value) and
+                                       stored[1] == value)):
+            return stored[2]
+        try:
+            converted = convert(value)
+        except (TypeError, ValueError, OverflowError) as error:
+            raise InvalidConfigValue(
+                f"Invalid value for {key}: {error}") from error
+        coerced[key] = (convert, value, converted)
+        return converted
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetches the values for several keys at once, returning a dictionary
+        of each key to the value gila.get(key) would return for it.
+
+        Keys that share a parent, such as ``database.host`` and
+        ``database.port``, only have the shadowing of that parent checked
+        once per layer, so this is cheaper than calling gila.get(key) in a
+        loop.
+
+        :param keys: :py:class:`~typing.Iterable[str]`: The keys to search
+            the config store for
+
+        """
+        return self.__reading(self.__get_many, list(keys))
+
+    def __get_many(self, keys: List[str]):
+        found = {}
+        memo = {}
+        cache = self.__cache
+        for key in keys:
+            if key in found:
+                continue
+            if self.__cache_enabled and key in cache:
+                self.__cache_hits += 1
+                found[key] = cache[key]
+                continue
+            found[key] = self.__find(key, memo)
+            if self.__cache_enabled:
+                self.__cache_misses += 1
+                cache[key] = found[key]
+        return found
+
+    def explain(self, key: str):
+        """
+        Returns an :py:class:`Explanation` named tuple of how gila.get(key)
+        is resolved, with:
+
+        - key: the key asked for
+        - real_key: the key after resolving aliases
+        - value: what gila.get(key) returns
+        - layer: the layer the value came from, one of 'override',
+          'auto_env', 'bound_env', 'config' or 'default', or 'miss'
+        - steps: a :py:class:`TraceStep` named tuple for each step of the
+          lookup, in order, with the layer searched, whether the key was
+          found in it, the value found, the parent key that shadows the key
+          in that layer if any, and the seconds the step took. The first
+          step, 'alias', resolves aliases and has the real key as its
+          value. A key nested under an alias is shadowed by it.
+        - seconds: the time the whole lookup took
+
+        The layers are searched exactly as gila.get(key) searches them, but
+        without the resolution cache. A key that is shadowed in a config
+        file read with lazy=True has True as its shadowed_by.
+
+        :param key: :py:class:`str`: The key to explain
+        """
+        return self.__reading(self.__explain, key)
+
+    def __explain(self, key: str):
+        steps = []
+        last = perf_counter()
+        for layer, found, value, shadowed_by in self.__trace_find(key):
+            now = perf_counter()
+            steps.append(TraceStep(layer, found, value, shadowed_by,
+                                   now - last))
+            # Building the trace isn't part of the next step
+            last = perf_counter()
+        seconds = sum(step.seconds for step in steps)
+        real_key = steps[0].value
+        if steps[-1].found:
+            return Explanation(key, real_key, steps[-1].value,
+                               steps[-1].layer, steps, seconds)
+        return Explanation(key, real_key, None, 'miss', steps, seconds)
+
+    @_writes
+    def snapshot(self):
+        """
+        Returns an immutable :py:class:`Snapshot` of the config store, with
+        the same get API. Every key known to the config store is resolved
+        up front and all values are frozen: dictionaries become read-only
+        mappings, lists become tuples and sets become frozensets.
+
+        Snapshots never change, so threads can read them without locking
+        while the config store is reloaded. Publish a new snapshot by
+        swapping the reference your readers use.
+
+        NOTE: Config files read with lazy=True are parsed in full.
+        """
+        memo = {}
+        values = {key: deep_freeze(value, memo)
+                  for key, value in self.__resolve_all().items()}
+        all_config = deep_freeze(self.all_config(), memo)
+        return Snapshot(values, all_config, self.__generation)
+
+    def publish_snapshot(self, path: str):
+        """
+        Publishes a snapshot of the config store to shared memory for other
+        processes to read with :py:class:`SharedSnapshot`, eg. so that the
+        master of a prefork server can read the config once and share it
+        with all of its workers. Returns the generation of the snapshot,
+        which increases every time a snapshot is published to path.
+
+        Every key known to the config store is resolved, like
+        gila.snapshot() does, and written with its value to a new file next
+        to path, which path is then pointed at. Workers keep reading the
+        previous snapshot until they call refresh(), so publishing after
+        every reload is safe while they are running.
+
+        :param path: :py:class:`str`: The file workers attach to. Use a path
+            on a tmpfs such as /dev/shm, so the snapshot stays in memory.
+
+        """
+        # Imported here, as only prefork servers need it
+        from .shared import write_snapshot
+        with self.__writing():
+            values = self.__resolve_all()
+            all_config = self.all_config()
+        # Written outside of the write lock, as readers don't need to wait
+        return write_snapshot(path, values, all_config)
+
+    def __resolve_all(self):
+        # Resolves every key known to the config store
+        keys = set(flatten_dict(self.__overrides, self.__key_delim))
+        keys.update(self.__env)
+        keys.update(self.__config_index)
+        if self.__lazy_sources:
+            keys.update(flatten_dict(self.__full_config(), self.__key_delim))
+        keys.update(flatten_dict(self.__defaults, self.__key_delim))
+        keys.update(self.__aliases)
+        if self.__automatic_env_applied:
+            keys.update(self.__auto_env_keys())
+
+        values = {}
+        for key in keys:
+            value = self.__find(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def __cached_find(self, key: str):
+        cache = self.__cache
+        try:
+            value = cache[key]
+        except KeyError:
+            self.__cache_misses += 1
+            value = cache[key] = self.__find(key)
+            return value
+        self.__cache_hits += 1
+        return value
+
+    # Functions related to the resolution cache
+    @_writes
+    def enable_cache(self):
+        """
+        Tells Gila to memoize the result of gila.get(key) for every key
+        requested. Any change made through Gila (overrides, defaults, env
+        bindings, aliases, config files, etc.) invalidates the cache.
+
+        NOTE: Changes made directly to ``os.environ`` are not seen by cached
+        keys until something else invalidates the cache.
+        """
+        self.__cache_enabled = True
+
+    @_writes
+    def disable_cache(self):
+        """
+        Stops memoizing lookups and drops any cached values
+        """
+        self.__cache_enabled = False
+        self.__cache = {}
+
+    def cache_info(self):
+        """
+        Returns a :py:class:`CacheInfo` named tuple with the number of cache
+        hits and misses, the number of cached keys and the current
+        generation of the config store, which increases on every change.
+        """
+        return CacheInfo(self.__cache_hits, self.__cache_misses,
+                         len(self.__cache), self.__generation)
+
+    # Functions related to prefork servers
+    @_writes
+    def prepare_for_fork(self):
+        """
+        Gets the config store ready to be shared with worker processes
+        forked from this one, eg. by the master of a gunicorn server after
+        it has read the config in. Call it last thing before forking.
+
+        Forked workers share the memory of their master until they write to
+        it, but CPython writes to every object its garbage collector looks
+        at, so each worker slowly ends up with its own copy of the config.
+        This rebuilds the config layers with interned keys, builds the
+        all_config view, and then runs a full collection and moves every
+        object in the process out of the collector's reach with
+        :py:func:`gc.freeze`, so that collections in the workers leave the
+        shared pages alone.
+
+        NOTE: This freezes every object alive in the process, not just
+        those of gila. They are never collected, so only call it once the
+        master is done setting up. gc.freeze needs Python 3.7 or later; on
+        older versions only the layers are rebuilt.
+        """
+        # Imported here, as only prefork servers need it
+        import gc
+        memo = {}
+        self.__config_sources = {
+            name: intern_keys(config, memo)
+            for name, config in self.__config_sources.items()}
+        self.__config = intern_keys(self.__config, memo)
+        self.__config_index = {
+            intern(key): intern_keys(value, memo)
+            for key, value in self.__config_index.items()}
+        self.__defaults = intern_keys(self.__defaults, memo)
+        self.__overrides = intern_keys(self.__overrides, memo)
+        # Cached values point at the layers from before they were rebuilt
+        self.__changed()
+        self.all_config()
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+    # Functions related to lookup statistics
+    @_writes
+    def enable_stats(self):
+        """
+        Starts recording statistics on gila.get(key): how often each key is
+        looked up, which layer resolved it and how long the lookups took.
+        Read them with gila.stats().
+
+        NOTE: Recording makes every gila.get(key) search the layers a second
+        time to find the layer that resolved the key. This is not included
+        in the recorded latency, but it is not free either.
+        """
+        if self.__stats is None:
+            self.__stats = StatsRecorder()
+
+    @_writes
+    def disable_stats(self):
+        """
+        Stops recording lookup statistics and drops any already recorded
+        """
+        self.__stats = None
+
+    def stats(self):
+        """
+        Returns a :py:class:`LookupStats` named tuple of the lookups
+        recorded since gila.enable_stats() or gila.reset_stats(), with:
+
+        - lookups: the number of lookups
+        - keys: the number of lookups of each key, by the layer that
+          resolved it
+        - layers: the number of lookups resolved by each layer, one of
+          'override', 'auto_env', 'bound_env', 'config', 'default' or
+          'miss'
+        - latency: a histogram of how long the lookups took, with the
+          number of lookups that took less than each power of two
+          nanoseconds, and at least half of it
+        """
+        stats = self.__stats
+        if stats is None:
+            return LookupStats(0, {}, {}, {})
+        return stats.stats()
+
+    @_writes
+    def reset_stats(self):
+        """
+        Drops the lookup statistics recorded so far, if they are enabled
+        """
+        if self.__stats is not None:
+            self.__stats = StatsRecorder()
+
+    # Functions related to thread safety
+    def enable_thread_safety(self):
+        """
+        Makes the config store safe to change from one thread while others
+        read from it. Every change is made under a write lock, while
+        gila.get(key) and the other lookups never take a lock: they are
+        simply retried in the rare case a change happened while they ran.
+
+        This should be enabled before the config store is shared between
+        threads. For reads that must see several keys from the same
+        version of the config, use gila.snapshot() instead.
+        """
+        if self.__lock is None:
+            self.__lock = StampedLock()
+
     def is_set(self, key: str):
         """
         Checks if a given key is in the config store.
@@ -289,27 +1161,44 @@ class Gila():
         :param key: :py:class:`str`: Key to check
 
         """
-        found_key = self.__find(key.lower())
+        found_key = self.__reading(self.__find, key.lower())
         if found_key is not None:
             return True
         return False
 
+    @_writes
     def all_config(self):
         """
         Returns a dictionary representing all of the current config values
         with the overrides in place.
+
+        The layers are merged key by key into nested dictionaries, so every
+        key holds what gila.get() returns for it, eg. a default for
+        ``db.timeout`` sits next to the ``db.host`` of a config file.
+
+        The merged values are kept between calls and only the top-level
+        keys that changed since the last call are merged again, so repeated
+        calls are cheap. Each call returns a new dictionary.
+
+        NOTE: When automatic_env or bind_env read ``os.environ`` live, the
+        keys they serve are resolved again on every call. Use
+        gila.snapshot_env() to avoid that. Config files read with lazy=True
+        are parsed in full.
         """
-        _d1 = self.__overrides
-        _t = None
-        _d = [self.__env, self.__config, self.__defaults]
-        for _d2 in _d:
-            if _t is None:
-                _t = dict_merge(_d1, _d2)
+        if self.__merged_stale is None:
+            self.__rebuild_merged()
+        else:
+            for key in self.__merged_stale:
+                self.__refresh_merged(key)
+        self.__merged_stale = set()
+        if self.__environ is None:
+            if self.__automatic_env_applied:
+                self.__merged_stale = None
             else:
-                _t = dict_merge(_t, _d2)
-        _t = [self.__real_key(key) for key in _t]
-        _t = dict([(key, self.__find(key)) for key in _t])
-        return _t
+                self.__merged_stale.update(
+                    self.__real_key(key).split(self.__key_delim)[0]
+                    for key in self.__env)
+        return dict(self.__merged)
 
     # For Debugging
     def debug(self):
@@ -323,19 +1212,36 @@ class Gila():
         print(f'Defaults: {self.__defaults}\n')
 
     # Functions related to aliasing
+    @_writes
     def register_alias(self, alias: str, key: str):
         """
         Registers an alias for a given key. When a key has an alias,
         gila.Get(key) and gila.Get(alias) will return the same value
 
+        Aliases can point at other aliases. Each alias is resolved to its
+        real key when it is registered, and registering an alias that would
+        make a loop of any length raises :py:class:`CircularReference`.
+
         :param alias: :py:class:`str`: Alias to give key
         :param key: :py:class:`str`: Real key in the config store
 
         """
-        if alias == key or alias == self.__real_key(key):
+        # The aliases have no loops, so following key either ends at a
+        # real key or comes back around to alias
+        target = key
+        while target != alias and target in self.__aliases:
+            target = self.__aliases[target]
+        if target == alias:
             raise CircularReference("No circular references")
-        self.__aliases[alias] = key
-
+        if alias in self.__aliases:
+            self.__aliases[alias] = key
+            self.__resolve_aliases()
+        else:
+            self.__aliases[alias] = key
+            self.__add_resolved_alias(alias, key)
+        self.__changed()
+
+    @_writes
     def deregister_alias(self, alias: str):
         """
         Removes an alias for a key in the config store.
@@ -344,8 +1250,11 @@ class Gila():
         """
         if alias in self.__aliases:
             del self.__aliases[alias]
+            self.__resolve_aliases()
+            self.__changed()
 
     # Functions related to overrides
+    @_writes
     def override(self, key: str, value: Any):
         """
         Sets the override value for a given key. Override values will take
@@ -358,10 +1267,16 @@ class Gila():
         key = self.__real_key(key)
         path = key.split(self.__key_delim)
         last_key = path[-1]
-        deepest_dict = deep_search(self.__overrides, path[0:-1])
-
-        deepest_dict[last_key] = value
-
+        try:
+            deepest_dict = deep_search(self.__overrides, path[0:-1])
+            deepest_dict[last_key] = value
+        finally:
+            # An override shadows the other layers for every key under its
+            # top-level key, so all of those may have changed. Invalidated
+            # even if setting it failed half way.
+            self.__changed([path[0]])
+
+    @_writes
     def remove_override(self, key: str):
         """
         Removes the override for a key, if it is currently set
@@ -371,7 +1286,9 @@ class Gila():
         key = self.__real_key(key)
         if key in self.__overrides:
             del self.__overrides[key]
+            self.__changed([key])
 
+    @_writes
     def override_with_env(self, prefix: str):
         """
         Finds all env vars with given prefix and sets them
@@ -389,13 +1306,39 @@ class Gila():
                 self.override(key[len(prefix)+1:].lower(), value)
 
     # Functions related to env
+    @_writes
     def automatic_env(self):
         """
         Tells Gila to automatically load env vars that
         start with the env_prefix, if set.
         """
         self.__automatic_env_applied = not self.__automatic_env_applied
+        self.__changed()
+
+    @_writes
+    def snapshot_env(self):
+        """
+        Tells Gila to take a one-time snapshot of the environment and to
+        resolve automatic and bound env vars from it, instead of reading
+        ``os.environ`` on every lookup. Use gila.refresh_env() to pick up
+        later changes to the environment.
+        """
+        self.__environ = dict(os_env)
+        self.__refresh_env_maps()
+        self.__changed()
+
+    @_writes
+    def refresh_env(self):
+        """
+        Takes a new snapshot of the environment, if gila.snapshot_env()
+        has been called. Otherwise env vars are always read live and this
+        does nothing.
+        """
+        if self.__environ is None:
+            return
+        self.snapshot_env()
 
+    @_writes
     def set_env_prefix(self, prefix: str):
         """
         Sets the prefix that the automatic environment loader will use to find
@@ -411,7 +1354,10 @@ class Gila():
         if not prefix:
             return
         self.__env_prefix = prefix
+        self.__refresh_env_maps()
+        self.__changed()
 
+    @_writes
     def bind_env(self, key: str, env_key: str = None):
         """
         Binds a given key to an environemnt variable. Default usage with
@@ -433,7 +1379,11 @@ class Gila():
         if not env_key:
             env_key = self.__merge_with_env_prefix(key)
         self.__env[key] = env_key
+        self.__env_trie.add(key)
+        self.__refresh_env_maps()
+        self.__changed([key])
 
+    @_writes
     def unbind_env(self, key: str):
         """
         Removes a binding between an env_var and a key, if it exists
@@ -442,8 +1392,12 @@ class Gila():
         """
         if key in self.__env:
             del self.__env[key]
+            self.__env_trie = KeyTrie(self.__env, self.__key_delim)
+            self.__refresh_env_maps()
+            self.__changed([key])
 
     # Functions related to config file loading
+    @_writes
     def set_config_type(self, filetype: str):
         """
         Sets the file extension that gila should look for -
@@ -459,25 +1413,9 @@ class Gila():
         if filetype not in self.__supported_exts:
             raise ConfigNotSupported(
                 f"The extensions Gila supports are {self.__supported_exts}")
-        if filetype in ['.yaml', '.yml']:
-            self.__config_type = '.yaml'
-            self.__config_resolver = yaml_to_dict
-        elif filetype in ['.toml']:
-            self.__config_type = '.toml'
-            self.__config_resolver = toml_to_dict
-        elif filetype in ['.json']:
-            self.__config_type = '.json'
-            self.__config_resolver = json_to_dict
-        elif filetype in ['.hcl']:
-            self.__config_type = '.hcl'
-            self.__config_resolver = hcl_to_dict
-        elif filetype in ['.properties', '.props', '.prop']:
-            self.__config_type = '.properties'
-            self.__config_resolver = prop_to_dict
-        elif filetype in ['.env']:
-            self.__config_type = '.env'
-            self.__config_resolver = env_to_dict
+        self.__config_type, self.__config_resolver = _config_types[filetype]
 
+    @_writes
     def set_config_name(self, filename: str):
         """
         Sets the filename that Gila will look for. If the filename is
@@ -493,6 +1431,7 @@ class Gila():
             return
         self.__config_name = filename
 
+    @_writes
     def add_config_path(self, filepath: str):
         """
         Adds a filepath to the list of filepaths to search for config files
@@ -506,6 +1445,7 @@ class Gila():
             return
         self.__config_paths.append(filepath)
 
+    @_writes
     def set_config_file(self, filepath: str):
         """
         Sets the filepath to the intended config file. This is an increased
@@ -522,21 +1462,346 @@ class Gila():
         self.__config_file = filepath
         self.__get_config_type()
 
-    def read_config_file(self):
+    def read_config_file(self, lazy: bool = False):
         """
         Will read in config from file. Gila will iterate through the given
         filepaths, and return the first file found in a config path that has
         the extension that is set with gila.set_config_type() if it is set, or
         the first file with a supported filetype.
+
+        Reading a file that has already been read replaces the values it
+        loaded the last time, and its values take precedence over those of
+        any other file read in before. Files are merged key by key, so a
+        nested section in one file only replaces the keys it sets in the
+        same section of the others.
+
+        Returns a :py:class:`ConfigDiff` named tuple with the sets of
+        dotted keys that were added, removed and changed in the config
+        values. Only lookups of those keys are invalidated.
+
+        :param lazy: :py:class:`bool`:  (Default value = False) Only index
+            the first two levels of keys of the file, and parse the subtree
+            under each second-level key the first time gila.get() looks it
+            up. This keeps the memory use of very large config files down
+            to the parts that are used. Only JSON files can be read lazily.
+            Lazily read files take precedence below all other config files,
+            and their :py:class:`ConfigDiff` holds top-level keys, with
+            every key that is still there counted as changed.
+
         """
-        filename = self.__get_config_file()
-        config = self.__config_resolver(filename)
-        if config is None:
-            config = {}
-        if not config:
+        with self.__writing():
+            filename = self.__get_config_file()
+            resolver = self.__config_resolver
+        if lazy:
+            if resolver is not json_to_dict:
+                raise ConfigNotSupported(
+                    "Only JSON config files can be read lazily")
+            return self.__load_lazy_config_file(filename)
+        return self.__load_config_file(filename, resolver)
+
+    async def aread_config_file(self, lazy: bool = False,
+                                processes: bool = False):
+        """
+        Like gila.read_config_file(), for asyncio applications. The file is
+        read, parsed and merged in a thread, so the event loop carries on
+        while it is read in, and only waits for the new config to be
+        swapped in. gila.get(key) keeps returning the old values until then.
+
+        Parsing large YAML, TOML or HCL files holds the GIL for long
+        stretches, which still slows the event loop down. Pass
+        processes=True to parse the file in another process instead.
+
+        :param lazy: :py:class:`bool`:  (Default value = False) See
+            gila.read_config_file()
+        :param processes: :py:class:`bool`:  (Default value = False) Parse
+            the file in a separate process. Ignored when lazy is set.
+
+        """
+        # Imported here, as only asyncio applications need it
+        import asyncio
+        loop = asyncio.get_event_loop()
+        if processes and not lazy:
+            return await loop.run_in_executor(
+                None, self.__read_config_file_in_process)
+        return await loop.run_in_executor(None, self.read_config_file, lazy)
+
+    def __read_config_file_in_process(self):
+        with self.__writing():
+            filename = self.__get_config_file()
+            resolver = self.__config_resolver
+        config, = _parse_config_files(self.__parse_cache,
+                                      {filename: resolver}, 1, True)
+        return self.__apply_config_source(filename, config)
+
+    def config_changes(self):
+        """
+        Returns a :py:class:`ConfigChanges` async iterator, which yields the
+        name and :py:class:`ConfigDiff` of every config file read in from
+        now on, whether by gila.read_config_file(),
+        gila.aread_config_file(), gila.read_config_files() or a reload by
+        gila.watch_config(). Must be called with an event loop running.
+        """
+        return ConfigChanges(self.__subscribe, self.__unsubscribe)
+
+    @_writes
+    def __subscribe(self, listener: Callable[[Any, ConfigDiff], None]):
+        self.__listeners = self.__listeners + (listener,)
+
+    @_writes
+    def __unsubscribe(self, listener: Callable[[Any, ConfigDiff], None]):
+        self.__listeners = tuple(
+            subscribed for subscribed in self.__listeners
+            if subscribed != listener)
+
+    def __notify(self, name: Any, diff: ConfigDiff):
+        # Called after the write lock is released, so listeners can read
+        # the new config
+        for listener in self.__listeners:
+            listener(name, diff)
+
+    def __load_config_file(self, filename: str, resolver: Callable,
+                           still_wanted: Callable[[], bool] = None):
+        config = _parse_config_file(self.__parse_cache, resolver, filename)
+        return self.__apply_config_source(filename, config, still_wanted)
+
+    def read_config_files(self, sources: Iterable[str],
+                          max_workers: int = None, processes: bool = False):
+        """
+        Will read in config from every config file matched by sources, eg.
+        the fragments of a conf.d directory, and merge them together.
+
+        Each source is either a directory, in which case every file in it
+        with a supported extension is read, or a glob pattern such as
+        ``conf.d/*.yaml``. Files are merged in the order of sources, and in
+        lexical order of their paths within each source. Later files take
+        precedence, and nested dictionaries are merged key by key rather
+        than replaced.
+
+        The files are parsed concurrently, so reading them takes about as
+        long as parsing the slowest one. Threads only help while parsing
+        waits on the disk; set processes to parse large files in separate
+        processes instead.
+
+        The merged files are loaded as a single config file named by
+        sources, so reading the same sources again replaces the values
+        they loaded the last time.
+
+        Returns a :py:class:`ConfigDiff` like gila.read_config_file().
+
+        :param sources: :py:class:`~typing.Iterable[str]`: Directories and
+            glob patterns of config files to read, lowest priority first
+        :param max_workers: :py:class:`int`:  (Default value = None)
+            Maximum number of files to parse at once
+        :param processes: :py:class:`bool`:  (Default value = False) Parse
+            files in a process pool instead of a thread pool
+
+        """
+        sources = tuple(sources)
+        filenames = self.__expand_config_sources(sources)
+        if not filenames:
+            raise ConfigFileNotFound(f"Couldn't find config in {sources}")
+        parse_cache = self.__parse_cache
+        if len(filenames) == 1 or max_workers == 1:
+            configs = [_parse_config_file(parse_cache, resolver, filename)
+                       for filename, resolver in filenames.items()]
+        else:
+            configs = _parse_config_files(
+                parse_cache, filenames, max_workers, processes)
+        config = {}
+        for fragment in configs:
+            config = deep_merge(fragment, config)
+        return self.__apply_config_source(sources, config)
+
+    def __expand_config_sources(self, sources: tuple):
+        from glob import glob
+        filenames = {}
+        for source in sources:
+            if os_path.isdir(source):
+                # Skip hidden files, eg. editor swap files and parse caches
+                matches = [
+                    os_path.join(source, name) for name in _list_dir(source)
+                    if not name.startswith('.') and
+                    os_path.splitext(name)[1] in self.__supported_exts]
+            else:
+                matches = [match for match in glob(source)
+                           if os_path.isfile(match)]
+            for match in sorted(matches):
+                _, file_extension = os_path.splitext(match)
+                if file_extension not in self.__supported_exts:
+                    raise ConfigNotSupported(
+                        f"The extensions Gila supports are "
+                        f"{self.__supported_exts}")
+                # A file matched twice is merged at its last position
+                filenames.pop(match, None)
+                filenames[match] = _config_types[file_extension][1]
+        return filenames
+
+    def __apply_config_source(self, name: Any, config: dict,
+                              still_wanted: Callable[[], bool] = None):
+        # Merge, index and diff the new config outside of the write lock,
+        # so that readers are only held up while it is swapped in
+        previous, previous_index = self.__reading(self.__config_state)
+        sources, merged, index = self.__merge_config_sources(
+            previous, name, config)
+        diff = ConfigDiff(*diff_flat_dicts(previous_index, index))
+
+        with self.__writing():
+            if still_wanted is not None and not still_wanted():
+                return None
+            if self.__config_sources is not previous:
+                # Another load finished first, so build on top of it
+                sources, merged, index = self.__merge_config_sources(
+                    self.__config_sources, name, config)
+                diff = ConfigDiff(
+                    *diff_flat_dicts(self.__config_index, index))
+            changed = diff.added | diff.removed | diff.changed
+            # A top-level key spelling a dotted path that the index already
+            # held doesn't change it, but is still a new key of all_config
+            changed.update(set(self.__config).symmetric_difference(merged))
+            if name in self.__lazy_sources:
+                # The file was read lazily before
+                lazy_sources = dict(self.__lazy_sources)
+                changed.update(lazy_sources.pop(name))
+                self.__lazy_sources = lazy_sources
+            self.__config_sources = sources
+            self.__config = merged
+            self.__config_index = index
+            self.__changed(changed)
+        self.__notify(name, diff)
+        return diff
+
+    def __load_lazy_config_file(self, filename: str,
+                                still_wanted: Callable[[], bool] = None):
+        # Imported here, as only some applications read config lazily
+        from .util.lazy import LazyJSON
+        try:
+            lazy = LazyJSON(filename)
+        except (OSError, ValueError):
+            lazy = None
+        if not lazy:
             raise ConfigFileNotFound(
                 f"Couldn't find config {filename}")
-        self.__config = dict_merge(config, self.__config)
+
+        with self.__writing():
+            if still_wanted is not None and not still_wanted():
+                return None
+            lazy_sources = dict(self.__lazy_sources)
+            previous = set(lazy_sources.pop(filename, ()))
+            lazy_sources[filename] = lazy
+            if filename in self.__config_sources:
+                # The file was read eagerly before
+                sources = dict(self.__config_sources)
+                previous.update(sources.pop(filename))
+                self.__config_sources = sources
+                self.__config, self.__config_index = \
+                    self.__fold_config_sources(sources)
+            self.__lazy_sources = lazy_sources
+            keys = set(lazy)
+            self.__changed(keys | previous)
+        diff = ConfigDiff(keys - previous, previous - keys, keys & previous)
+        self.__notify(filename, diff)
+        return diff
+
+    def __config_state(self):
+        return self.__config_sources, self.__config_index
+
+    @_writes
+    def enable_parse_cache(self, cache_dir: str = None):
+        """
+        Tells Gila to keep the parsed contents of config files in an
+        on-disk cache, so that reading a config file that hasn't changed
+        since it was last parsed, eg. when a new process starts up, skips
+        parsing it. A cached file is only used while the size,
+        modification time and content hash of the config file still match.
+
+        NOTE: Cache files are unpickled, so the cache directory must only
+        be writable by trusted users.
+
+        :param cache_dir: :py:class:`str`:  (Default value = None) Directory
+            to keep the cache in. If not set, the cache for each config file
+            is kept in a hidden file next to it.
+
+        """
+        self.__parse_cache = ParseCache(cache_dir)
+
+    @_writes
+    def disable_parse_cache(self):
+        """
+        Stops using the on-disk cache of parsed config files
+        """
+        self.__parse_cache = None
+
+    @_writes
+    def watch_config(self,
+                     callback: Callable[[str, ConfigDiff], None] = None,
+                     debounce: float = 0.1):
+        """
+        Starts watching the config file for changes, and reads it in again
+        whenever it changes. The file is watched from a background thread
+        using inotify where available, otherwise by checking its
+        modification time every second, so gila.get(key) is never held up
+        by the watcher.
+
+        Bursts of writes, such as editors writing a temporary file and
+        renaming it over the config file, only cause a single reload. If
+        the changed file can't be read the current config is kept, and
+        exceptions raised by reading it or by callback are logged. Either
+        way the file keeps being watched.
+
+        :param callback: :py:class:`~typing.Callable`:  (Default value =
+            None) Optional function to call after each reload, with the
+            path of the config file and the :py:class:`ConfigDiff` of the
+            reload. It is called from the watcher thread.
+        :param debounce: :py:class:`float`: (Default value = 0.1) Seconds
+            the file must be left alone before it is read in again
+
+        """
+        filename = self.__get_config_file()
+        resolver = self.__config_resolver
+        self.unwatch_config()
+
+        def reload():
+            def still_wanted():
+                return self.__watcher is watcher
+            try:
+                if filename in self.__lazy_sources:
+                    diff = self.__load_lazy_config_file(
+                        filename, still_wanted)
+                else:
+                    diff = self.__load_config_file(
+                        filename, resolver, still_wanted)
+            except ConfigFileNotFound:
+                return
+            if callback and diff is not None:
+                callback(filename, diff)
+
+        # Imported here, as only applications that hot reload need it
+        from .util.watcher import ConfigWatcher
+        watcher = ConfigWatcher(filename, reload, debounce=debounce)
+        self.__watcher = watcher
+        watcher.start()
+
+    @_writes
+    def unwatch_config(self):
+        """
+        Stops watching the config file, if gila.watch_config() was called
+        """
+        if self.__watcher is not None:
+            self.__watcher.stop()
+            self.__watcher = None
+
+    def __merge_config_sources(self, sources: dict, name: Any,
+                               config: dict):
+        sources = dict(sources)
+        sources.pop(name, None)
+        sources[name] = config
+        return (sources,) + self.__fold_config_sources(sources)
+
+    def __fold_config_sources(self, sources: dict):
+        merged = {}
+        for source in sources.values():
+            merged = deep_merge(source, merged)
+        return merged, flatten_dict(merged, self.__key_delim)
 
     def in_config(self, key: str):
         """
@@ -546,9 +1811,14 @@ class Gila():
         :param key: :py:class:`str`: key to check in config values
 
         """
-        return key in self.__config
+        return self.__reading(self.__in_config, key)
+
+    def __in_config(self, key: str):
+        return key in self.__config or any(
+            key in lazy for lazy in self.__lazy_sources.values())
 
     # Functions related to default values
+    @_writes
     def set_default(self, key: str, value: Any):
         """
         Sets the default value for key to value. If no other values are
@@ -560,10 +1830,14 @@ class Gila():
         """
         path = key.split(self.__key_delim)
         last_key = path[-1]
-        deepest_dict = deep_search(self.__defaults, path[0:-1])
-
-        deepest_dict[last_key] = value
-
+        try:
+            deepest_dict = deep_search(self.__defaults, path[0:-1])
+            deepest_dict[last_key] = value
+        finally:
+            # Invalidated even if setting it failed half way
+            self.__changed([key])
+
+    @_writes
     def remove_default(self, key: str):
         """
         Remove the default key.
@@ -573,9 +1847,73 @@ class Gila():
         """
         path = key.split(self.__key_delim)
         last_key = path[-1]
-        deepest_dict = deep_search(self.__defaults, path[0:-1])
+        # Looked up without creating the parents that are missing, so that
+        # nothing changes if the key isn't set
+        deepest_dict = self.__defaults
+        for segment in path[0:-1]:
+            deepest_dict = deepest_dict.get(segment)
+            if not isinstance(deepest_dict, dict):
+                raise KeyError(key)
+        if last_key not in deepest_dict:
+            raise KeyError(key)
 
         del deepest_dict[last_key]
+        self.__changed([key])
+
+
+def _list_dir(dirpath: str):
+    # Returns the names of the files in dirpath. The listing is cached, and
+    # dirpath is only scanned again once its modification time changes.
+    try:
+        mtime = stat(dirpath).st_mtime_ns
+    except OSError:
+        return frozenset()
+    cached = _dir_listings.get(dirpath)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        with scandir(dirpath) as entries:
+            filenames = frozenset(
+                entry.name for entry in entries if entry.is_file())
+    except OSError:
+        return frozenset()
+    if time() - mtime / 1e9 > _racy_mtime_window:
+        # A file added within the same timestamp tick as the scan would
+        # not change the modification time, so recent listings are not
+        # trusted
+        _dir_listings[dirpath] = (mtime, filenames)
+    return filenames
+
+
+def _parse_config_file(parse_cache: ParseCache, resolver: Callable,
+                       filename: str):
+    # Module level so that it can be run in a process pool
+    if parse_cache is None:
+        config = resolver(filename)
+    else:
+        config = parse_cache.load(resolver, filename)
+    # A file that doesn't hold a mapping, eg. a YAML file cut short at a
+    # scalar while it is being written, is as unreadable as a missing one
+    if not config or not isinstance(config, dict):
+        raise ConfigFileNotFound(
+            f"Couldn't find config {filename}")
+    return config
+
+
+def _parse_config_files(parse_cache: ParseCache,
+                        filenames: Dict[str, Callable], max_workers: int,
+                        processes: bool):
+    # Imported here, as concurrent.futures is slow to import
+    if processes:
+        from concurrent.futures import ProcessPoolExecutor as Executor
+        max_workers = max_workers or min(len(filenames), cpu_count() or 1)
+    else:
+        from concurrent.futures import ThreadPoolExecutor as Executor
+        max_workers = max_workers or min(len(filenames),
+                                         (cpu_count() or 1) + 4)
+    with Executor(max_workers) as executor:
+        return list(executor.map(_parse_config_file, repeat(parse_cache),
+                                 filenames.values(), filenames.keys()))
 
 
 # Singleton functionality
@@ -642,6 +1980,16 @@ def remove_default(key: str):
     return _gila.remove_default(key)
 
 
+def snapshot_env():
+    # Singleton function for Gila.snapshot_env
+    return _gila.snapshot_env()
+
+
+def refresh_env():
+    # Singleton function for Gila.refresh_env
+    return _gila.refresh_env()
+
+
 def bind_env(key: str, env_key: str = None):
     # Singleton function for Gila.bind_env
     return _gila.bind_env(key, env_key)
@@ -677,9 +2025,46 @@ def remove_override(key: str):
     return _gila.remove_override(key)
 
 
-def read_config_file():
+def read_config_file(lazy: bool = False):
     # Singleton function for Gila.read_config_file
-    return _gila.read_config_file()
+    return _gila.read_config_file(lazy)
+
+
+def read_config_files(sources: Iterable[str], max_workers: int = None,
+                      processes: bool = False):
+    # Singleton function for Gila.read_config_files
+    return _gila.read_config_files(sources, max_workers, processes)
+
+
+def enable_parse_cache(cache_dir: str = None):
+    # Singleton function for Gila.enable_parse_cache
+    return _gila.enable_parse_cache(cache_dir)
+
+
+def disable_parse_cache():
+    # Singleton function for Gila.disable_parse_cache
+    return _gila.disable_parse_cache()
+
+
+async def aread_config_file(lazy: bool = False, processes: bool = False):
+    # Singleton function for Gila.aread_config_file
+    return await _gila.aread_config_file(lazy, processes)
+
+
+def config_changes():
+    # Singleton function for Gila.config_changes
+    return _gila.config_changes()
+
+
+def watch_config(callback: Callable[[str, ConfigDiff], None] = None,
+                 debounce: float = 0.1):
+    # Singleton function for Gila.watch_config
+    return _gila.watch_config(callback, debounce)
+
+
+def unwatch_config():
+    # Singleton function for Gila.unwatch_config
+    return _gila.unwatch_config()
 
 
 def get(key: str):
@@ -687,6 +2072,101 @@ def get(key: str):
     return _gila.get(key)
 
 
+def key(key: str):
+    # Singleton function for Gila.key
+    return _gila.key(key)
+
+
+def get_int(key: str):
+    # Singleton function for Gila.get_int
+    return _gila.get_int(key)
+
+
+def get_float(key: str):
+    # Singleton function for Gila.get_float
+    return _gila.get_float(key)
+
+
+def get_bool(key: str):
+    # Singleton function for Gila.get_bool
+    return _gila.get_bool(key)
+
+
+def get_duration(key: str):
+    # Singleton function for Gila.get_duration
+    return _gila.get_duration(key)
+
+
+def get_list(key: str):
+    # Singleton function for Gila.get_list
+    return _gila.get_list(key)
+
+
+def get_many(keys: Iterable[str]):
+    # Singleton function for Gila.get_many
+    return _gila.get_many(keys)
+
+
+def explain(key: str):
+    # Singleton function for Gila.explain
+    return _gila.explain(key)
+
+
+def snapshot():
+    # Singleton function for Gila.snapshot
+    return _gila.snapshot()
+
+
+def publish_snapshot(path: str):
+    # Singleton function for Gila.publish_snapshot
+    return _gila.publish_snapshot(path)
+
+
+def enable_cache():
+    # Singleton function for Gila.enable_cache
+    return _gila.enable_cache()
+
+
+def disable_cache():
+    # Singleton function for Gila.disable_cache
+    return _gila.disable_cache()
+
+
+def cache_info():
+    # Singleton function for Gila.cache_info
+    return _gila.cache_info()
+
+
+def enable_stats():
+    # Singleton function for Gila.enable_stats
+    return _gila.enable_stats()
+
+
+def disable_stats():
+    # Singleton function for Gila.disable_stats
+    return _gila.disable_stats()
+
+
+def stats():
+    # Singleton function for Gila.stats
+    return _gila.stats()
+
+
+def reset_stats():
+    # Singleton function for Gila.reset_stats
+    return _gila.reset_stats()
+
+
+def prepare_for_fork():
+    # Singleton function for Gila.prepare_for_fork
+    return _gila.prepare_for_fork()
+
+
+def enable_thread_safety():
+    # Singleton function for Gila.enable_thread_safety
+    return _gila.enable_thread_safety()
+
+
 def debug():
     # Singleton function for Gila.debug
     _gila.debug()
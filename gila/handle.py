@@ -0,0 +1,73 @@
+"""
+Precompiled handles to single keys of a Gila config store
+"""
+from typing import Any, Callable
+
+
+class KeyCell():
+    """
+    The state a :py:class:`KeyHandle` shares with the config store it came
+    from: the key compiled against the current aliases and env prefix, and
+    its last resolved value. The config store marks the cell invalid
+    whenever the key may have changed.
+    """
+    __slots__ = ('key', 'path', 'real_key', 'real_path', 'env_name',
+                 'alias_shadowed', 'valid', 'value')
+
+    def __init__(self, key: str):
+        self.key = key
+        self.path = []
+        self.real_key = key
+        self.real_path = []
+        self.env_name = ''
+        self.alias_shadowed = False
+        self.valid = False
+        self.value = None
+
+
+class KeyHandle():
+    """
+    A reusable handle to a single key, created with gila.key(key).
+
+    The key is split, resolved through aliases and turned into its env var
+    name once, and its value is kept until a change made through Gila
+    affects it, so handle.get() in a hot loop costs little more than an
+    attribute lookup. Handles pick up changes to aliases, env bindings and
+    the env prefix by themselves, eg.
+    ::
+
+        pool_size = gila.key("database.pool.size")
+        ...
+        for request in requests:
+            size = pool_size.get()
+
+    NOTE: Values read live from ``os.environ`` are resolved again on every
+    call, unless gila.snapshot_env() or gila.enable_cache() is used.
+    """
+    __slots__ = ('__key', '__cell', '__resolve')
+
+    def __init__(self, key: str, cell: KeyCell,
+                 resolve: Callable[[KeyCell], Any]):
+        self.__key = key
+        self.__cell = cell
+        self.__resolve = resolve
+
+    @property
+    def key(self):
+        """
+        The key this handle looks up
+        """
+        return self.__key
+
+    def get(self):
+        """
+        Fetches the value for the key, like gila.get(key). Returns None if
+        no value is found.
+        """
+        cell = self.__cell
+        if cell.valid:
+            return cell.value
+        return self.__resolve(cell)
+
+    def __repr__(self):
+        return f'KeyHandle({self.__key!r})'
@@ -0,0 +1,254 @@
+"""
+Config snapshots published to shared memory, so that the workers of a
+prefork server can read the config resolved by their master process
+"""
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable
+from zlib import crc32
+
+_MAGIC = b'GILASHM1'
+# The file at the published path: magic, generation of the current data
+_POINTER = struct.Struct('<8sQ')
+# The start of a data file: magic, generation, number of slots in the hash
+# table, offset and length of the pickled all_config
+_HEADER = struct.Struct('<8sQQQQ')
+# A slot of the hash table: crc32 of the key, length of the key, offset of
+# the key, which the value follows, and length of the value. Empty slots
+# have an offset of 0.
+_SLOT = struct.Struct('<IIQQ')
+
+
+def _data_path(path: str, generation: int):
+    return f'{path}.{generation}'
+
+
+def _read_generation(path: str):
+    try:
+        with open(path, 'rb') as pointer_file:
+            magic, generation = _POINTER.unpack(
+                pointer_file.read(_POINTER.size))
+    except (OSError, struct.error):
+        return 0
+    return generation if magic == _MAGIC else 0
+
+
+def _replace(path: str, contents: bytes):
+    # Writes contents to path in one step, so readers never see part of it
+    from tempfile import mkstemp
+    directory = os.path.dirname(path) or '.'
+    handle, temp_path = mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as temp_file:
+            temp_file.write(contents)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def write_snapshot(path: str, values: Dict[str, Any], all_config: dict):
+    """
+    Writes values and all_config to a new data file next to path, points
+    path at it and returns its generation. The data file of the previous
+    generation is removed: workers that still have it mapped keep reading
+    it until they refresh.
+
+    :param path: :py:class:`str` - the path workers attach to, ideally on
+        a tmpfs such as /dev/shm so that nothing is written to disk
+
+    :param values: :py:class:`~typing.Dict[str, Any]` - every key and its
+        resolved value
+
+    :param all_config: :py:class:`dict` - the top-level keys and values
+    """
+    import pickle
+    generation = _read_generation(path) + 1
+    slots = 8
+    while slots < len(values) * 2:
+        slots *= 2
+    table = bytearray(slots * _SLOT.size)
+    blobs = [b'']
+    offset = _HEADER.size + len(table)
+    for key, value in values.items():
+        encoded = key.encode()
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        key_hash = crc32(encoded)
+        index = key_hash & (slots - 1)
+        while _SLOT.unpack_from(table, index * _SLOT.size)[2]:
+            index = (index + 1) & (slots - 1)
+        _SLOT.pack_into(table, index * _SLOT.size, key_hash, len(encoded),
+                        offset, len(value))
+        blobs.append(encoded)
+        blobs.append(value)
+        offset += len(encoded) + len(value)
+    all_config = pickle.dumps(all_config, pickle.HIGHEST_PROTOCOL)
+    blobs.append(all_config)
+    blobs[0] = _HEADER.pack(_MAGIC, generation, slots, offset,
+                            len(all_config)) + table
+
+    _replace(_data_path(path, generation), b''.join(blobs))
+    pointer = _POINTER.pack(_MAGIC, generation)
+    try:
+        # Written in place, as workers map the file to check it cheaply
+        with open(path, 'r+b') as pointer_file:
+            pointer_file.write(pointer)
+    except FileNotFoundError:
+        _replace(path, pointer)
+    try:
+        os.remove(_data_path(path, generation - 1))
+    except OSError:
+        pass
+    return generation
+
+
+class SharedSnapshot():
+    """
+    A read-only view of a config snapshot that another process published
+    with gila.publish_snapshot(path), eg. the master of a prefork server.
+
+    The published data is memory-mapped, so every process attached to it
+    shares a single copy. Nothing is parsed when attaching: each lookup
+    finds its key in a hash table in the shared memory, and only unpickles
+    the value it returns. Values are new copies on every lookup, so they can
+    be changed freely without affecting anything else.
+
+    A snapshot stays at the generation it is attached to until refresh()
+    moves it to the one published last, eg.
+    ::
+
+        # In the master, after every reload
+        gila.publish_snapshot("/dev/shm/myapp-config")
+
+        # In each worker
+        config = SharedSnapshot("/dev/shm/myapp-config")
+        ...
+        config.refresh()
+        host = config.get("database.host")
+
+    NOTE: Values are unpickled, so the published path and the directory
+    holding it must only be writable by users trusted to run code in the
+    workers.
+
+    :param path: :py:class:`str` - the path the snapshot was published to
+    """
+
+    def __init__(self, path: str):
+        import pickle
+        self.__loads = pickle.loads
+        self.__path = path
+        with open(path, 'rb') as pointer_file:
+            self.__pointer = mmap.mmap(pointer_file.fileno(), _POINTER.size,
+                                       access=mmap.ACCESS_READ)
+        self.__data = None
+        self.__generation = 0
+        self.__mask = 0
+        self.__all_config = (0, 0)
+        if not self.refresh():
+            raise FileNotFoundError(f"No snapshot published to {path}")
+
+    @property
+    def generation(self):
+        """
+        The generation of the published snapshot this view is attached to
+        """
+        return self.__generation
+
+    @property
+    def latest_generation(self):
+        """
+        The generation published last, which refresh() would move to
+        """
+        return _POINTER.unpack_from(self.__pointer)[1]
+
+    def refresh(self):
+        """
+        Attaches to the snapshot published last, if it is newer than the
+        one currently attached. Returns whether it moved to a new one.
+        Checking costs a read from shared memory, so it is cheap enough to
+        call on every request.
+        """
+        magic, generation = _POINTER.unpack_from(self.__pointer)
+        if magic != _MAGIC or generation == self.__generation:
+            return False
+        try:
+            with open(_data_path(self.__path, generation), 'rb') as data_file:
+                data = mmap.mmap(data_file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Superseded while it was being opened, the next refresh will
+            # pick up the newer one
+            return False
+        magic, data_generation, slots, offset, length = \
+            _HEADER.unpack_from(data)
+        if magic != _MAGIC or data_generation != generation:
+            data.close()
+            return False
+        if self.__data is not None:
+            self.__data.close()
+        self.__data = data
+        self.__generation = generation
+        self.__mask = slots - 1
+        self.__all_config = (offset, length)
+        return True
+
+    def get(self, key: str):
+        """
+        Fetches the value for a given key as it was when the snapshot was
+        published. Returns None if no value is found.
+
+        :param key: :py:class:`str`: The key to search the snapshot for
+
+        """
+        data = self.__data
+        encoded = key.encode()
+        key_hash = crc32(encoded)
+        index = key_hash & self.__mask
+        while True:
+            slot_hash, key_len, offset, value_len = _SLOT.unpack_from(
+                data, _HEADER.size + index * _SLOT.size)
+            if not offset:
+                return None
+            if slot_hash == key_hash and key_len == len(encoded) and \
+                    data[offset:offset + key_len] == encoded:
+                offset += key_len
+                return self.__loads(data[offset:offset + value_len])
+            index = (index + 1) & self.__mask
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetches the values for several keys at once, returning a dictionary
+        of each key to its value.
+
+        :param keys: :py:class:`~typing.Iterable[str]`: The keys to search
+            the snapshot for
+
+        """
+        return {key: self.get(key) for key in keys}
+
+    def is_set(self, key: str):
+        """
+        Checks if a given key is in the snapshot.
+
+        :param key: :py:class:`str`: Key to check
+
+        """
+        return self.get(key.lower()) is not None
+
+    def all_config(self):
+        """
+        Returns a dictionary of every top-level key in the snapshot to its
+        value.
+        """
+        offset, length = self.__all_config
+        return self.__loads(self.__data[offset:offset + length])
+
+    def close(self):
+        """
+        Detaches from the published snapshot
+        """
+        if self.__data is not None:
+            self.__data.close()
+            self.__data = None
+        self.__pointer.close()
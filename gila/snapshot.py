@@ -0,0 +1,72 @@
+"""
+Immutable, fully resolved copies of a Gila config store
+"""
+from typing import Any, Dict, Iterable, Mapping
+
+
+class Snapshot():
+    """
+    An immutable copy of a Gila config store, created with gila.snapshot().
+
+    Every key known to the config store is resolved when the snapshot is
+    taken, and all values are frozen, so a snapshot can be shared between
+    threads and read without any locking. To pick up later changes take a
+    new snapshot and swap the reference readers use, eg.
+    ::
+
+        config = gila.snapshot()
+        ...
+        gila.read_config_file()
+        config = gila.snapshot()
+    """
+    __slots__ = ('__values', '__all_config', '__generation')
+
+    def __init__(self, values: Dict[str, Any], all_config: Mapping,
+                 generation: int):
+        self.__values = values
+        self.__all_config = all_config
+        self.__generation = generation
+
+    @property
+    def generation(self):
+        """
+        The generation of the config store this snapshot was taken at
+        """
+        return self.__generation
+
+    def get(self, key: str):
+        """
+        Fetches the value for a given key as it was when the snapshot was
+        taken. Returns None if no value is found.
+
+        :param key: :py:class:`str`: The key to search the snapshot for
+
+        """
+        return self.__values.get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetches the values for several keys at once, returning a dictionary
+        of each key to its value.
+
+        :param keys: :py:class:`~typing.Iterable[str]`: The keys to search
+            the snapshot for
+
+        """
+        return {key: self.__values.get(key) for key in keys}
+
+    def is_set(self, key: str):
+        """
+        Checks if a given key is in the snapshot.
+
+        :param key: :py:class:`str`: Key to check
+
+        """
+        return self.__values.get(key.lower()) is not None
+
+    def all_config(self):
+        """
+        Returns a read-only mapping of every top-level key in the snapshot
+        to its value.
+        """
+        return self.__all_config
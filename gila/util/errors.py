@@ -13,3 +13,7 @@ class ConfigFileNotFound(Exception):
 
 class CircularReference(Exception):
     pass
+
+
+class InvalidConfigValue(ValueError):
+    pass
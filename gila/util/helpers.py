@@ -1,13 +1,24 @@
 """
 Misc functions to clean up main file
+
+The parser for each config format is only imported the first time a file
+of that format is read, so that importing gila stays cheap.
 """
-from typing import List
-from yaml import safe_load
-from json import load as json_load
-from toml import load as toml_load
-from hcl import load as hcl_load
-from dotenv import dotenv_values as env_load
-from configparser import ConfigParser
+import re
+from datetime import timedelta
+from sys import intern
+from types import MappingProxyType
+from typing import Any, List, Set, Tuple
+
+_true_strings = {'1', 't', 'true', 'y', 'yes', 'on'}
+_false_strings = {'0', 'f', 'false', 'n', 'no', 'off'}
+# Microseconds in each unit of a Go style duration
+_duration_units = {
+    'ns': 1e-3, 'us': 1, '\u00b5s': 1, '\u03bcs': 1, 'ms': 1e3, 's': 1e6,
+    'm': 6e7, 'h': 3.6e9,
+}
+_duration_part = re.compile(
+    r'(\d+(?:\.\d*)?|\.\d+)(ns|us|\u00b5s|\u03bcs|ms|s|m|h)')
 
 
 def deep_search(haystack: dict, keypath: List[str]):
@@ -54,6 +65,160 @@ def deep_search(haystack: dict, keypath: List[str]):
     return to_search
 
 
+def flatten_dict(haystack: dict, delim: str):
+    """
+    Builds a flat index of every reachable dotted path in haystack to the
+    value found at that path. Nested dictionaries and keys that already
+    contain the delimiter are both followed, so for
+    ::
+
+        haystack = {
+            "foo": {
+                "bar.baz": 1
+            }
+        }
+
+    the index contains ``foo``, ``foo.bar.baz`` and the intermediary
+    dictionaries along the way.
+
+    When more than one layout of haystack spells the same dotted path, the
+    one whose leading keys span the most path elements wins, eg.
+    ``{"foo.bar": 1}`` takes precedence over ``{"foo": {"bar": 2}}``.
+
+    :param haystack: :py:class:`dict` - dictionary to flatten
+
+    :param delim: :py:class:`str` - delimiter used to join nested keys
+    """
+    if not isinstance(haystack, dict):
+        raise TypeError()
+    index = {}
+    _flatten_into(index, haystack, None, delim)
+    return index
+
+
+def _flatten_into(index: dict, to_flatten: dict, prefix: str, delim: str):
+    items = to_flatten.items()
+    if any(isinstance(key, str) and delim in key for key in to_flatten):
+        # Visit keys spanning more path elements first, so that they claim
+        # their dotted path before any nested spelling of it does
+        items = sorted(items, reverse=True,
+                       key=lambda item: str(item[0]).count(delim))
+    for key, value in items:
+        if not isinstance(key, str):
+            continue
+        full_key = key if prefix is None else f'{prefix}{delim}{key}'
+        if full_key not in index:
+            index[full_key] = value
+        if isinstance(value, dict):
+            _flatten_into(index, value, full_key, delim)
+
+
+def diff_flat_dicts(old: dict, new: dict) -> Tuple[Set, Set, Set]:
+    """
+    Compares two flat indexes built with :py:func:`flatten_dict`, and
+    returns the sets of keys that were added, removed and changed between
+    them. The intermediary dictionaries that lead to values count too, eg.
+    reading ``{"b": {"b": 0}}`` again as ``{"b.b": 0}`` removes ``b``, and
+    one changes whenever anything beneath it does. As the index only keeps
+    one spelling of each dotted path, that can be the only sign of a change
+    to another spelling.
+
+    :param old: :py:class:`dict` - index before the change
+
+    :param new: :py:class:`dict` - index after the change
+    """
+    added, removed, changed = set(), set(), set()
+    for key, value in new.items():
+        if _has_children(value):
+            if key not in old:
+                added.add(key)
+            elif _has_children(old[key]) and not (
+                    old[key] is value or old[key] == value):
+                changed.add(key)
+            continue
+        if key not in old or _has_children(old[key]):
+            added.add(key)
+        elif not _same_value(old[key], value):
+            changed.add(key)
+    for key, value in old.items():
+        if _has_children(value):
+            if key not in new:
+                removed.add(key)
+            continue
+        if key not in new or _has_children(new[key]):
+            removed.add(key)
+    return added, removed, changed
+
+
+def _has_children(value: Any):
+    return isinstance(value, dict) and len(value) > 0
+
+
+def _same_value(value_1: Any, value_2: Any):
+    # True == 1, but a config value changing from one to the other changed
+    return value_1 is value_2 or (
+        type(value_1) is type(value_2) and value_1 == value_2)
+
+
+def deep_freeze(value: Any, memo: dict = None):
+    """
+    Returns an immutable copy of value, where dictionaries become read-only
+    :py:class:`~types.MappingProxyType` views of frozen copies, lists and
+    tuples become tuples and sets become frozensets. Any other value is
+    returned as is.
+
+    :param value: Any - value to freeze
+
+    :param memo: :py:class:`dict` - (Default value = None) Optional
+        dictionary of already frozen containers by id, so containers
+        reachable from several places are only frozen once
+    """
+    if not isinstance(value, (dict, list, tuple, set)):
+        return value
+    if memo is None:
+        memo = {}
+    if id(value) in memo:
+        return memo[id(value)]
+    if isinstance(value, dict):
+        frozen = MappingProxyType({
+            key: deep_freeze(item, memo) for key, item in value.items()})
+    elif isinstance(value, set):
+        frozen = frozenset(value)
+    else:
+        frozen = tuple(deep_freeze(item, memo) for item in value)
+    memo[id(value)] = frozen
+    return frozen
+
+
+def intern_keys(value: Any, memo: dict = None):
+    """
+    Returns a copy of value where the string keys of every dictionary are
+    interned, so that equal keys all over the config are a single object,
+    and every dictionary is rebuilt to fit its keys. Lists are copied and
+    any other value is returned as is.
+
+    :param value: Any - value to copy
+
+    :param memo: :py:class:`dict` - (Default value = None) Optional
+        dictionary of already copied containers by id, so containers
+        reachable from several places stay shared between them
+    """
+    if not isinstance(value, (dict, list)):
+        return value
+    if memo is None:
+        memo = {}
+    if id(value) in memo:
+        return memo[id(value)]
+    if isinstance(value, dict):
+        copied = {
+            intern(key) if type(key) is str else key: intern_keys(item, memo)
+            for key, item in value.items()}
+    else:
+        copied = [intern_keys(item, memo) for item in value]
+    memo[id(value)] = copied
+    return copied
+
+
 def yaml_to_dict(filepath: str):
     """
     Loads in config from a yaml file to a dictionary using
@@ -65,6 +230,7 @@ def yaml_to_dict(filepath: str):
         yaml config file to unmarshal
     """
     try:
+        from yaml import safe_load
         with open(filepath, 'r') as yml_config:
             return safe_load(yml_config)
     except Exception:
@@ -82,6 +248,7 @@ def prop_to_dict(filepath: str):
         dotenv config file to unmarshal
     """
     try:
+        from configparser import ConfigParser
         with open(filepath, 'r') as prop_config:
             config = ConfigParser()
             config.read_string(
@@ -100,6 +267,7 @@ def json_to_dict(filepath: str):
         json config file to unmarshal
     """
     try:
+        from json import load as json_load
         with open(filepath, 'r') as json_config:
             return json_load(json_config)
     except Exception:
@@ -117,6 +285,7 @@ def toml_to_dict(filepath: str):
         toml config file to unmarshal
     """
     try:
+        from toml import load as toml_load
         with open(filepath, 'r') as toml_config:
             return toml_load(toml_config)
     except Exception:
@@ -134,6 +303,7 @@ def hcl_to_dict(filepath: str):
         hcl config file to unmarshal
     """
     try:
+        from hcl import load as hcl_load
         with open(filepath, 'r') as hcl_config:
             return hcl_load(hcl_config)
     except Exception:
@@ -153,6 +323,7 @@ def env_to_dict(filepath: str):
         dotenv config file to unmarshal
     """
     try:
+        from dotenv import dotenv_values as env_load
         config = env_load(filepath)
         return config
     except Exception:
@@ -174,3 +345,143 @@ def dict_merge(dict_1: dict, dict_2: dict):
     """
 
     return {**dict_2, **dict_1}
+
+
+def deep_merge(dict_1: dict, dict_2: dict):
+    """Merge two dictionaries recursively.
+
+    `dict_1` > `dict_2`
+    Like :py:func:`dict_merge`, except that where both dictionaries hold a
+    dictionary under the same key, those are merged in turn instead of the
+    one from dict1 replacing the one from dict2.
+
+    Subtrees that the merge leaves unchanged are shared with the inputs
+    rather than copied, and a new dictionary is only made for each level
+    along a path where dict1 changes something. If dict1 changes nothing,
+    dict2 itself is returned. Neither input is modified, but the result
+    must not be modified either.
+
+    :params dict_1: the primary dictionary to pull results from
+    :params dict_2: the secondary dictionary to pull results from
+    """
+    if not dict_2:
+        return dict_1
+    merged = None
+    for key, value in dict_1.items():
+        existing = dict_2.get(key, _missing)
+        if isinstance(value, dict) and isinstance(existing, dict):
+            value = deep_merge(value, existing)
+        if value is existing:
+            continue
+        if merged is None:
+            merged = dict(dict_2)
+        merged[key] = value
+    return dict_2 if merged is None else merged
+
+
+_missing = object()
+
+
+def to_int(value: Any):
+    """
+    Converts a config value to an :py:class:`int`. Strings are parsed as
+    base 10, and floats must not have a fractional part.
+
+    :param value: Any - value to convert
+    """
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f'{value!r} is not a whole number')
+        return int(value)
+    if isinstance(value, str):
+        return int(value, 10)
+    raise TypeError(f'Expected an int, got {type(value).__name__}')
+
+
+def to_float(value: Any):
+    """
+    Converts a config value to a :py:class:`float`.
+
+    :param value: Any - value to convert
+    """
+    if isinstance(value, (int, float, str)):
+        return float(value)
+    raise TypeError(f'Expected a float, got {type(value).__name__}')
+
+
+def to_bool(value: Any):
+    """
+    Converts a config value to a :py:class:`bool`. Strings such as
+    ``true``, ``yes``, ``on`` and ``1`` or ``false``, ``no``, ``off`` and
+    ``0`` are accepted in any case, as are the ints 0 and 1.
+
+    :param value: Any - value to convert
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _true_strings:
+            return True
+        if lowered in _false_strings:
+            return False
+    raise ValueError(f'{value!r} is not a boolean')
+
+
+def to_duration(value: Any):
+    """
+    Converts a config value to a :py:class:`~datetime.timedelta`. Numbers
+    are taken as seconds, and strings are either a number of seconds or a
+    Go style duration such as ``300ms``, ``1.5s`` or ``1h30m``.
+
+    :param value: Any - value to convert
+    """
+    if isinstance(value, timedelta):
+        return value
+    if isinstance(value, bool):
+        raise TypeError('Expected a duration, got bool')
+    if isinstance(value, (int, float)):
+        return timedelta(seconds=value)
+    if not isinstance(value, str):
+        raise TypeError(f'Expected a duration, got {type(value).__name__}')
+    text = value.strip()
+    try:
+        seconds = float(text)
+    except ValueError:
+        pass
+    else:
+        return timedelta(seconds=seconds)
+    sign = -1 if text.startswith('-') else 1
+    if text[:1] in '+-':
+        text = text[1:]
+    microseconds = 0
+    position = 0
+    for match in _duration_part.finditer(text):
+        if match.start() != position:
+            break
+        microseconds += float(match.group(1)) * _duration_units[
+            match.group(2)]
+        position = match.end()
+    if not text or position != len(text):
+        raise ValueError(f'{value!r} is not a duration')
+    return timedelta(microseconds=sign * microseconds)
+
+
+def to_list(value: Any):
+    """
+    Converts a config value to a :py:class:`list`. Strings are split on
+    commas, with whitespace around each item removed.
+
+    :param value: Any - value to convert
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    if isinstance(value, str):
+        if not value.strip():
+            return []
+        return [item.strip() for item in value.split(',')]
+    raise TypeError(f'Expected a list, got {type(value).__name__}')
@@ -0,0 +1,319 @@
+"""
+Lazily parsed config files, so that processes which only read a few parts
+of a very large config file don't have to hold all of it in memory
+"""
+import mmap
+import os
+import re
+from json import loads
+from threading import Lock
+from typing import Any, Callable, List, Tuple
+
+from .errors import ConfigFileNotFound
+
+_STRING_PATTERN = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+
+
+def _nested_pattern(depth: int):
+    # Matches everything up to the next bracket that isn't part of a
+    # container nested at most depth levels deep, stepping over strings
+    pattern = rb'(?:[^"{}\[\]]+|' + _STRING_PATTERN + rb')*'
+    for _ in range(depth):
+        pattern = (rb'(?:[^"{}\[\]]+|' + _STRING_PATTERN +
+                   rb'|[{\[]' + pattern + rb'[}\]])*')
+    return pattern
+
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(_STRING_PATTERN, re.DOTALL)
+_SCALAR = re.compile(rb'[^,:}\]\s]+')
+# Skipping whole containers in the regex engine keeps the Python loop in
+# _skip_container down to the brackets of deeply nested containers
+_UNTIL_BRACKET = re.compile(_nested_pattern(4), re.DOTALL)
+_OPENING = b'{['
+_CLOSING = b'}]'
+_BOM = b'\xef\xbb\xbf'
+# Bytes of the file scanned between handing its pages back to the kernel
+_RELEASE_EVERY = 1 << 20
+
+
+class _Node():
+    # The span of a value in the file, and the spans of its keys if it is
+    # an object that was indexed
+    __slots__ = ('start', 'end', 'children', 'parsed', 'value')
+
+    def __init__(self, start: int, end: int, children: dict = None):
+        self.start = start
+        self.end = end
+        self.children = children
+        self.parsed = False
+        self.value = None
+
+
+class LazyJSON():
+    """
+    A read-only view of a JSON config file, where values are only parsed
+    the first time they are looked up.
+
+    The file is memory-mapped and scanned once to index the keys of the
+    top-level object and of the objects directly beneath it, without
+    parsing any values. Looking up a key then parses just the second-level
+    subtree it is in, which is kept for later lookups.
+
+    Pages of the file are handed back to the kernel as soon as they have
+    been scanned, and values are read from the file with positioned reads,
+    so memory use follows the size of the subtrees looked up rather than
+    the size of the file. Parts of the file that are never
+    looked up are not checked beyond their brackets and strings, so a
+    malformed value only raises a :py:class:`ValueError` when it is first
+    looked up.
+
+    If the file is changed in place once it has been scanned, looking up a
+    value that hasn't been parsed yet raises
+    :py:class:`ConfigFileNotFound` rather than reading the new contents at
+    the old positions. Read the file again to pick up the change.
+
+    :param filepath: :py:class:`str` - the JSON file to load. It must hold
+        an object.
+    """
+
+    def __init__(self, filepath: str):
+        self.__filepath = filepath
+        self.__read_lock = Lock()
+        # Kept open, so values are read from the file that was scanned even
+        # if another one is moved to the same path
+        self.__fd = os.open(filepath, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            self.__pinned = _pin(self.__fd)
+            # The map is only used for the scan. Reading a page of a map
+            # whose file was truncated kills the process, so values are
+            # read with positioned reads afterwards.
+            self.__buffer = mmap.mmap(self.__fd, 0, access=mmap.ACCESS_READ)
+            try:
+                self.__scan()
+            finally:
+                self.__buffer.close()
+                self.__buffer = None
+            if _pin(self.__fd) != self.__pinned:
+                raise ValueError(f'{filepath} changed while it was read')
+        except BaseException:
+            self.__close()
+            raise
+
+    def __del__(self):
+        self.__close()
+
+    def __close(self):
+        fd, self.__fd = getattr(self, '_LazyJSON__fd', None), None
+        if fd is not None:
+            os.close(fd)
+
+    def __scan(self):
+        filepath = self.__filepath
+        start = len(_BOM) if self.__buffer[:len(_BOM)] == _BOM else 0
+        start = _skip_whitespace(self.__buffer, start)
+        if self.__buffer[start:start + 1] != b'{':
+            raise ValueError(f'{filepath} does not hold a JSON object')
+        self.__released = 0
+        self.__index, end = _index_object(self.__buffer, start, 2,
+                                          self.__release)
+        if _skip_whitespace(self.__buffer, end) != len(self.__buffer):
+            raise ValueError(f'Extra data after the object in {filepath}')
+
+    def __contains__(self, key: str):
+        return key in self.__index
+
+    def __iter__(self):
+        return iter(self.__index)
+
+    def __len__(self):
+        return len(self.__index)
+
+    def resolve(self, path: List[str], delim: str = '.') -> Tuple[Any, bool]:
+        """
+        Returns the value at path, or None if there is none, and whether
+        the path is shadowed by a value that is not an object at one of its
+        parents. Only the subtrees holding path are parsed.
+
+        Keys that contain the delimiter are followed like nested objects,
+        and when several spellings of path are in the file the one whose
+        leading keys span the most elements of it wins, the same as for
+        :py:func:`~gila.util.helpers.flatten_dict`.
+
+        :param path: :py:class:`~typing.List[str]` - keys to follow
+
+        :param delim: :py:class:`str` - the key delimiter
+        """
+        found, value = self.__find(self.__index, path, delim)
+        if found:
+            return value, False
+        return None, self.__is_shadowed(path)
+
+    def __find(self, nodes: dict, path: List[str], delim: str):
+        # Tries the spellings of path in nodes, longest leading key first
+        for span in range(len(path), 0, -1):
+            node = nodes.get(delim.join(path[0:span]))
+            if node is None:
+                continue
+            if span == len(path):
+                return True, self.__parse(node)
+            if node.children is not None:
+                found, value = self.__find(node.children, path[span:], delim)
+            else:
+                found, value = _find_in_dict(self.__parse(node), path[span:],
+                                             delim)
+            if found:
+                return found, value
+        return False, None
+
+    def __is_shadowed(self, path: List[str]):
+        node = self.__index.get(path[0])
+        if node is None or len(path) == 1:
+            return False
+        if node.children is None:
+            return bool(self.__parse(node))
+        child = node.children.get(path[1])
+        if child is None:
+            return False
+        value = self.__parse(child)
+        for key in path[2:]:
+            if not isinstance(value, dict):
+                return bool(value)
+            if key not in value:
+                return False
+            value = value[key]
+        return False
+
+    def materialize(self):
+        """
+        Returns the whole file as a dictionary, parsing every value that
+        hasn't been looked up yet.
+        """
+        return {key: self.__parse(node) for key, node in self.__index.items()}
+
+    def __release(self, position: int):
+        # Drops the pages before position from memory while the file is
+        # scanned
+        if not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        position -= position % mmap.PAGESIZE
+        if position - self.__released >= _RELEASE_EVERY:
+            self.__buffer.madvise(mmap.MADV_DONTNEED, 0, position)
+            self.__released = position
+
+    def __read(self, start: int, end: int):
+        if hasattr(os, 'pread'):
+            data = os.pread(self.__fd, end - start, start)
+        else:
+            with self.__read_lock:
+                os.lseek(self.__fd, start, os.SEEK_SET)
+                data = os.read(self.__fd, end - start)
+        # Checked after reading, so a change made while reading is caught
+        if len(data) != end - start or _pin(self.__fd) != self.__pinned:
+            raise ConfigFileNotFound(
+                f"{self.__filepath} changed since it was read")
+        return data
+
+    def __parse(self, node: _Node):
+        if not node.parsed:
+            if node.children is None:
+                node.value = loads(self.__read(node.start, node.end))
+            else:
+                # Built from the children, so subtrees already looked up
+                # are shared instead of parsed again
+                node.value = {key: self.__parse(child)
+                              for key, child in node.children.items()}
+            node.parsed = True
+        return node.value
+
+
+def _find_in_dict(value: Any, path: List[str], delim: str):
+    # Tries the spellings of path in a parsed value, longest leading key
+    # first, and returns whether one was found and its value
+    if not isinstance(value, dict):
+        return False, None
+    for span in range(len(path), 0, -1):
+        key = delim.join(path[0:span])
+        if key not in value:
+            continue
+        if span == len(path):
+            return True, value[key]
+        found, child = _find_in_dict(value[key], path[span:], delim)
+        if found:
+            return found, child
+    return False, None
+
+
+def _pin(fd: int):
+    # Rewriting a file in place changes its size or modification time
+    stat = os.fstat(fd)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _skip_whitespace(buffer: mmap.mmap, position: int):
+    return _WHITESPACE.match(buffer, position).end()
+
+
+def _index_object(buffer: mmap.mmap, position: int, depth: int,
+                  scanned: Callable[[int], None]):
+    # Returns the nodes of the values of the object at position by key, and
+    # the position after the object. Objects are indexed depth levels deep,
+    # and scanned is called with the position after each value.
+    index = {}
+    position = _skip_whitespace(buffer, position + 1)
+    if buffer[position:position + 1] == b'}':
+        return index, position + 1
+    while True:
+        match = _STRING.match(buffer, position)
+        if match is None:
+            raise ValueError(f'Expected a key at byte {position}')
+        key = loads(match.group())
+        position = _skip_whitespace(buffer, match.end())
+        if buffer[position:position + 1] != b':':
+            raise ValueError(f'Expected a colon at byte {position}')
+        start = _skip_whitespace(buffer, position + 1)
+        if depth > 1 and buffer[start:start + 1] == b'{':
+            children, end = _index_object(buffer, start, depth - 1,
+                                          scanned)
+            index[key] = _Node(start, end, children)
+        else:
+            index[key] = _Node(start, _skip_value(buffer, start))
+        scanned(index[key].end)
+        position = _skip_whitespace(buffer, index[key].end)
+        separator = buffer[position:position + 1]
+        if separator == b'}':
+            return index, position + 1
+        if separator != b',':
+            raise ValueError(f'Expected a comma at byte {position}')
+        position = _skip_whitespace(buffer, position + 1)
+
+
+def _skip_value(buffer: mmap.mmap, position: int):
+    # Returns the position after the value at position, without parsing it
+    first = buffer[position:position + 1]
+    if first and first in _OPENING:
+        return _skip_container(buffer, position)
+    pattern = _STRING if first == b'"' else _SCALAR
+    match = pattern.match(buffer, position)
+    if match is None:
+        raise ValueError(f'Expected a value at byte {position}')
+    return match.end()
+
+
+def _skip_container(buffer: mmap.mmap, position: int):
+    # Only the brackets of deeply nested containers are looked at in
+    # Python, everything between them is skipped by the regex engine
+    depth = 0
+    while True:
+        bracket = buffer[position:position + 1]
+        if not bracket:
+            raise ValueError('Unexpected end of file')
+        if bracket in _OPENING:
+            depth += 1
+        elif bracket in _CLOSING:
+            depth -= 1
+            if depth == 0:
+                return position + 1
+        else:
+            raise ValueError(f'Unterminated string at byte {position}')
+        position = _UNTIL_BRACKET.match(buffer, position + 1).end()
@@ -0,0 +1,85 @@
+"""
+Locks used to make a Gila instance safe to share between threads
+"""
+from contextlib import contextmanager
+from threading import RLock, get_ident
+from typing import Callable
+
+
+class StampedLock():
+    """
+    A readers-writer lock where writers are serialized by a reentrant lock
+    and readers never take a lock at all.
+
+    Writers bump a stamp when they start and again when they finish, so
+    the stamp is odd while a write is in progress. Readers run
+    optimistically and are retried if the stamp moved while they ran, which
+    keeps the read path down to two attribute reads when nothing is being
+    written.
+
+    Readers may see partially written state before they are retried, so
+    they must not have side effects that outlive the retry.
+    """
+
+    def __init__(self):
+        self.__lock = RLock()
+        self.__stamp = 0
+        self.__owner = None
+        self.__depth = 0
+
+    @contextmanager
+    def write(self):
+        """
+        Context manager that holds the write lock. Reentrant, so a writer
+        can call other writers.
+        """
+        with self.__lock:
+            self.__depth += 1
+            if self.__depth == 1:
+                self.__owner = get_ident()
+                self.__stamp += 1
+            try:
+                yield
+            finally:
+                self.__depth -= 1
+                if self.__depth == 0:
+                    self.__owner = None
+                    self.__stamp += 1
+
+    def read(self, func: Callable, *args):
+        """
+        Runs func(*args) until it completes without a write happening at
+        the same time, and returns its result.
+
+        :param func: :py:class:`~typing.Callable` - the read to run
+        """
+        while True:
+            stamp = self.__stamp
+            if stamp & 1:
+                if self.__owner == get_ident():
+                    # Reads from inside a write see the writer's own state
+                    return func(*args)
+                # Wait for the writer to finish before trying again
+                with self.__lock:
+                    continue
+            try:
+                result = func(*args)
+            except Exception:
+                if self.__stamp == stamp:
+                    raise
+                continue
+            if self.__stamp == stamp:
+                return result
+
+
+class NoLock():
+    """
+    Stand-in for :py:class:`StampedLock` when thread safety is disabled
+    """
+
+    @contextmanager
+    def write(self):
+        yield
+
+    def read(self, func: Callable, *args):
+        return func(*args)
@@ -0,0 +1,116 @@
+"""
+On-disk cache of parsed config files, so that processes starting up can
+skip parsing config files that haven't changed
+"""
+import os
+from typing import Callable
+
+_CACHE_VERSION = 1
+_CACHE_SUFFIX = '.gila-cache'
+
+
+class ParseCache():
+    """
+    Stores the result of a config resolver, such as
+    :py:func:`~gila.util.helpers.yaml_to_dict`, in a pickle file and loads
+    it back instead of parsing the config file again while it is unchanged.
+
+    A cached result is keyed by the path of the config file and the
+    resolver, and is only used while the size, modification time and
+    content hash of the file all still match.
+
+    NOTE: Cache files are unpickled, so the cache directory must only be
+    writable by users trusted to run code in the process.
+
+    :param cache_dir: :py:class:`str` - (Default value = None) Directory to
+        store cache files in. If not set, each cache file is stored as a
+        hidden file next to its config file.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        self.__cache_dir = cache_dir
+
+    def load(self, resolver: Callable, filepath: str):
+        """
+        Returns what resolver(filepath) returns, from the cache if it is
+        still valid.
+
+        :param resolver: :py:class:`~typing.Callable` - the config resolver
+
+        :param filepath: :py:class:`str` - the config file to load
+        """
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return resolver(filepath)
+        cache_path = self.__cache_path(resolver, filepath)
+        key = (_CACHE_VERSION, os.path.abspath(filepath), resolver.__name__,
+               stat.st_size, stat.st_mtime_ns)
+
+        digest = self.__digest(filepath)
+        cached = self.__read(cache_path, key, digest)
+        if cached is not None:
+            return cached
+
+        config = resolver(filepath)
+        if config is not None and digest is not None:
+            self.__write(cache_path, key, digest, config)
+        return config
+
+    def __cache_path(self, resolver: Callable, filepath: str):
+        if self.__cache_dir is None:
+            directory, basename = os.path.split(filepath)
+            return os.path.join(directory, f'.{basename}{_CACHE_SUFFIX}')
+        from hashlib import sha1
+        name = sha1(
+            f'{os.path.abspath(filepath)}:{resolver.__name__}'.encode())
+        return os.path.join(self.__cache_dir,
+                            f'{name.hexdigest()}{_CACHE_SUFFIX}')
+
+    @staticmethod
+    def __digest(filepath: str):
+        from hashlib import blake2b
+        digest = blake2b()
+        try:
+            with open(filepath, 'rb') as config_file:
+                for chunk in iter(lambda: config_file.read(1 << 20), b''):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.digest()
+
+    @staticmethod
+    def __read(cache_path: str, key: tuple, digest: bytes):
+        # The key and digest are pickled ahead of the config, so a stale
+        # cache file is rejected without unpickling the config
+        import pickle
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                if pickle.load(cache_file) != (key, digest):
+                    return None
+                return pickle.load(cache_file)
+        except Exception:
+            return None
+
+    def __write(self, cache_path: str, key: tuple, digest: bytes,
+                config: dict):
+        import pickle
+        from tempfile import mkstemp
+        directory = os.path.dirname(cache_path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            handle, temp_path = mkstemp(dir=directory, suffix='.tmp')
+        except OSError:
+            # Caching is best effort, eg. the directory may be read-only
+            return
+        try:
+            with os.fdopen(handle, 'wb') as cache_file:
+                pickle.dump((key, digest), cache_file,
+                            pickle.HIGHEST_PROTOCOL)
+                pickle.dump(config, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
@@ -0,0 +1,58 @@
+"""
+Statistics on the lookups made through a Gila config store
+"""
+from collections import namedtuple
+from threading import Lock
+
+LookupStats = namedtuple('LookupStats', ['lookups', 'keys', 'layers',
+                                         'latency'])
+
+
+class StatsRecorder():
+    """
+    Counts lookups by key and by the layer that resolved them, and keeps a
+    histogram of their latency with a bucket per power of two nanoseconds.
+
+    Recording takes a lock, so counts stay exact when several threads look
+    up keys at once.
+    """
+
+    def __init__(self):
+        self.__lock = Lock()
+        # Key -> layer -> number of lookups
+        self.__keys = {}
+        # Bucket i counts lookups that took less than 2 ** i nanoseconds,
+        # and at least 2 ** (i - 1)
+        self.__latency = [0] * 64
+
+    def record(self, key: str, layer: str, seconds: float):
+        """
+        Records a single lookup
+
+        :param key: :py:class:`str` - the key looked up
+        :param layer: :py:class:`str` - the layer that resolved it
+        :param seconds: :py:class:`float` - how long the lookup took
+        """
+        bucket = min(int(seconds * 1e9).bit_length(), 63)
+        with self.__lock:
+            layers = self.__keys.get(key)
+            if layers is None:
+                layers = self.__keys[key] = {}
+            layers[layer] = layers.get(layer, 0) + 1
+            self.__latency[bucket] += 1
+
+    def stats(self):
+        """
+        Returns a :py:class:`LookupStats` named tuple of what has been
+        recorded so far
+        """
+        with self.__lock:
+            keys = {key: dict(layers) for key, layers in self.__keys.items()}
+            latency = list(self.__latency)
+        totals = {}
+        for layers in keys.values():
+            for layer, count in layers.items():
+                totals[layer] = totals.get(layer, 0) + count
+        histogram = {1 << bucket: count
+                     for bucket, count in enumerate(latency) if count}
+        return LookupStats(sum(totals.values()), keys, totals, histogram)
@@ -0,0 +1,80 @@
+"""
+Prefix tries of config keys, so that checking whether a key is shadowed by
+one of its parents takes a single walk down the key
+"""
+from typing import Iterable, List
+
+# Marks the nodes of a trie that hold a key. Real key segments are always
+# strings, so None can't clash with one.
+_KEY = None
+
+
+class KeyTrie():
+    """
+    The keys of one layer of the config store, split on the key delimiter
+    and stored as a tree of segments.
+
+    Whether any parent of a key is in the layer can then be answered in
+    one walk down the segments of the key, instead of joining and looking
+    up each parent in turn.
+
+    :param keys: :py:class:`~typing.Iterable[str]` - the keys to store
+
+    :param delim: :py:class:`str` - the key delimiter
+    """
+    __slots__ = ('__root', '__delim')
+
+    def __init__(self, keys: Iterable[str] = (), delim: str = '.'):
+        self.__root = {}
+        self.__delim = delim
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str):
+        """
+        Adds a key to the trie
+
+        :param key: :py:class:`str` - the key to add
+        """
+        node = self.__root
+        for segment in key.split(self.__delim):
+            node = node.setdefault(segment, {})
+        node[_KEY] = True
+
+    def shadowing_parent(self, path: List[str]):
+        """
+        Returns the shortest parent of path that is a key in the trie, or
+        None if there is none
+
+        :param path: :py:class:`~typing.List[str]` - the segments of a key
+        """
+        node = self.__root
+        for index in range(len(path) - 1):
+            node = node.get(path[index])
+            if node is None:
+                return None
+            if _KEY in node:
+                return self.__delim.join(path[0:index + 1])
+        return None
+
+
+def shadowing_parent(nested: dict, path: List[str], delim: str):
+    """
+    Returns the shortest parent of path that holds a value other than a
+    dict in nested, or None if the walk down path ends at an empty value
+    first. A nested dict is its own trie of its keys.
+
+    :param nested: :py:class:`dict` - the nested dict to walk
+
+    :param path: :py:class:`~typing.List[str]` - the segments of a key
+
+    :param delim: :py:class:`str` - the key delimiter
+    """
+    node = nested
+    for index in range(len(path) - 1):
+        node = node.get(path[index])
+        if not node:
+            return None
+        if not isinstance(node, dict):
+            return delim.join(path[0:index + 1])
+    return None
@@ -0,0 +1,187 @@
+"""
+Watches a config file for changes, so that Gila can hot reload it
+"""
+import logging
+import os
+import struct
+from select import select
+from threading import Event, Lock, Thread
+from typing import Callable
+
+# From <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM |
+               _IN_MOVED_TO | _IN_CREATE | _IN_DELETE)
+_EVENT_HEADER = struct.Struct('iIII')
+_logger = logging.getLogger(__name__)
+
+
+def _load_inotify():
+    # inotify is only reachable through libc, and only on Linux
+    try:
+        from ctypes import CDLL
+        from ctypes.util import find_library
+        libc = CDLL(find_library('c') or 'libc.so.6', use_errno=True)
+        return libc.inotify_init1, libc.inotify_add_watch
+    except (ImportError, OSError, AttributeError):
+        return None
+
+
+class ConfigWatcher(Thread):
+    """
+    A daemon thread that calls on_change once a config file has changed.
+
+    Changes are picked up with inotify where it is available, which costs
+    nothing while the file is left alone. Elsewhere the file is polled for
+    changes to its modification time, size or inode every poll_interval
+    seconds.
+
+    The directory holding the file is watched rather than the file itself,
+    so editors that write a temporary file and rename it over the original
+    are handled. Bursts of changes are debounced: on_change is only called
+    once the file has been left alone for debounce seconds. Exceptions
+    raised by on_change are logged, and the file keeps being watched.
+
+    :param filepath: :py:class:`str` - the file to watch
+
+    :param on_change: :py:class:`~typing.Callable` - called without any
+        arguments from the watcher thread after the file changed
+
+    :param debounce: :py:class:`float` - seconds the file must be left
+        alone before on_change is called
+
+    :param poll_interval: :py:class:`float` - seconds between checks when
+        inotify is not available
+
+    :param use_inotify: :py:class:`bool` - set to False to always poll
+    """
+
+    def __init__(self, filepath: str, on_change: Callable[[], None],
+                 debounce: float = 0.1, poll_interval: float = 1.0,
+                 use_inotify: bool = True):
+        super().__init__(name=f'gila-watcher-{filepath}', daemon=True)
+        self.__filepath = os.path.abspath(filepath)
+        self.__on_change = on_change
+        self.__debounce = debounce
+        self.__poll_interval = poll_interval
+        self.__inotify = _load_inotify() if use_inotify else None
+        self.__stopped = Event()
+        self.__started = Event()
+        self.__stop_lock = Lock()
+        self.__wake_read, self.__wake_write = os.pipe()
+
+    def start(self):
+        """
+        Starts the watcher thread, and waits until it is watching the file
+        so that no change made after this returns can be missed.
+        """
+        super().start()
+        self.__started.wait()
+
+    def stop(self):
+        """
+        Tells the watcher to stop. This does not wait for the thread to
+        exit, so it is safe to call from on_change.
+        """
+        with self.__stop_lock:
+            if self.__stopped.is_set():
+                return
+            os.write(self.__wake_write, b'\0')
+            self.__stopped.set()
+
+    def run(self):
+        try:
+            if self.__inotify is None or not self.__watch_inotify():
+                self.__watch_polling()
+        finally:
+            self.__started.set()
+            with self.__stop_lock:
+                self.__stopped.set()
+                os.close(self.__wake_read)
+                os.close(self.__wake_write)
+
+    def __notify(self):
+        # An exception would end the thread, so no later change would be
+        # picked up
+        try:
+            self.__on_change()
+        except Exception:
+            _logger.exception('Handling a change to %s failed',
+                              self.__filepath)
+
+    def __watch_inotify(self):
+        inotify_init1, inotify_add_watch = self.__inotify
+        fd = inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return False
+        try:
+            directory = os.fsencode(os.path.dirname(self.__filepath))
+            if inotify_add_watch(fd, directory, _WATCH_MASK) < 0:
+                return False
+            self.__started.set()
+            while not self.__stopped.is_set():
+                # Blocks until the directory changes or stop() is called
+                select([fd, self.__wake_read], [], [])
+                if not self.__drain(fd):
+                    continue
+                # Wait for the burst of events to settle
+                while select([fd, self.__wake_read], [], [],
+                             self.__debounce)[0]:
+                    if self.__stopped.is_set():
+                        return True
+                    self.__drain(fd)
+                if not self.__stopped.is_set():
+                    self.__notify()
+            return True
+        finally:
+            os.close(fd)
+
+    def __drain(self, fd: int):
+        # Reads every pending event, returns whether any was for our file
+        name = os.fsencode(os.path.basename(self.__filepath))
+        matched = False
+        while True:
+            try:
+                events = os.read(fd, 65536)
+            except BlockingIOError:
+                return matched
+            offset = 0
+            while offset < len(events):
+                _, _, _, length = _EVENT_HEADER.unpack_from(events, offset)
+                offset += _EVENT_HEADER.size
+                event_name = events[offset:offset + length].rstrip(b'\0')
+                offset += length
+                matched = matched or event_name == name
+
+    def __stat(self):
+        try:
+            stat = os.stat(self.__filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def __watch_polling(self):
+        last_seen = self.__stat()
+        self.__started.set()
+        while not self.__stopped.wait(self.__poll_interval):
+            current = self.__stat()
+            if current == last_seen:
+                continue
+            # Wait for the burst of changes to settle
+            while not self.__stopped.wait(self.__debounce):
+                settled = self.__stat()
+                if settled == current:
+                    break
+                current = settled
+            if self.__stopped.is_set():
+                return
+            last_seen = current
+            self.__notify()
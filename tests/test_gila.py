@@ -1,6 +1,18 @@
+import asyncio
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
 import unittest
+from datetime import timedelta
+from tempfile import TemporaryDirectory
+from threading import Thread
 
 import gila
+from gila.util.helpers import flatten_dict
 from os import environ as os_env
 from singleton import singleton_helper
 
@@ -73,6 +85,37 @@ class TestBaseGila(unittest.TestCase):
         gila.deregister_alias(alias)
         self.assertEqual(gila.get(key), value)
 
+    def test_alias_chains(self):
+        gila.override("real", "value")
+        gila.register_alias("c", "real")
+        gila.register_alias("a", "b")
+        self.assertIsNone(gila.get("a"))
+        gila.register_alias("b", "c")
+        self.assertEqual(gila.get("a"), "value")
+        self.assertEqual(gila.get("b"), "value")
+
+        gila.register_alias("c", "other")
+        gila.override("other", "other value")
+        self.assertEqual(gila.get("a"), "other value")
+
+        gila.deregister_alias("b")
+        self.assertIsNone(gila.get("a"))
+        self.assertEqual(gila.get("c"), "other value")
+
+    def test_alias_cycles(self):
+        with self.assertRaises(gila.CircularReference):
+            gila.register_alias("a", "a")
+        gila.register_alias("a", "b")
+        gila.register_alias("b", "c")
+        with self.assertRaises(gila.CircularReference):
+            gila.register_alias("c", "a")
+        gila.register_alias("c", "d")
+        # Pointing an alias already in the chain back at its start
+        with self.assertRaises(gila.CircularReference):
+            gila.register_alias("c", "a")
+        gila.override("d", "value")
+        self.assertEqual(gila.get("a"), "value")
+
     def test_set_env(self):
         key = "GILA_TEST"
         var = "VALUES"
@@ -116,6 +159,17 @@ class TestBaseGila(unittest.TestCase):
         singleton_helper()
         self.assertEqual(gila.get(key), 'new_value')
 
+    def test_import_is_lazy(self):
+        # Parsers are only imported once a file of their format is read, and
+        # the modules of optional features once they are used
+        parsers = ['yaml', 'toml', 'hcl', 'dotenv', 'configparser',
+                   'gila.shared', 'gila.util.watcher']
+        script = ('import sys, gila; '
+                  f'print([m for m in {parsers!r} if m in sys.modules])')
+        output = subprocess.run([sys.executable, '-c', script],
+                                stdout=subprocess.PIPE, check=True)
+        self.assertEqual(output.stdout.strip(), b'[]')
+
     def test_all_config(self):
         key = "gila_key"
         env_key2 = "env_key"
@@ -144,6 +198,576 @@ class TestBaseGila(unittest.TestCase):
         self.assertEqual(all_conf.get(env_key2), env_value2)
         self.assertEqual(all_conf.get(config_key), "yaml")
 
+    def test_all_config_updates(self):
+        gila.set_default("database", {"host": "localhost"})
+        gila.set_default("debug", False)
+        all_conf = gila.all_config()
+        self.assertEqual(dict(all_conf), {"database": {"host": "localhost"},
+                                          "debug": False})
+        self.assertEqual(json.loads(json.dumps(all_conf)), all_conf)
+        all_conf["debug"] = True
+        self.assertEqual(gila.all_config()["debug"], False)
+
+        gila.override("debug", True)
+        gila.remove_default("database")
+        all_conf = gila.all_config()
+        self.assertEqual(dict(all_conf), {"debug": True})
+
+        gila.register_alias("verbose", "debug")
+        gila.set_default("verbose", False)
+        gila.remove_override("debug")
+        self.assertEqual(dict(gila.all_config()), {"debug": False})
+
+    def test_all_config_live_env(self):
+        key = "gila_live"
+        os_env[key.upper()] = "value"
+        gila.bind_env(key)
+        self.assertEqual(gila.all_config()[key], "value")
+        os_env[key.upper()] = "new value"
+        self.assertEqual(gila.all_config()[key], "new value")
+
+    def test_all_config_matches_rebuild(self):
+        # The incremental view against one resolved from scratch, after
+        # random changes to a small set of keys that shadow each other
+        keys = ["a", "b", "a.a", "a.b", "b.a", "a.a.a", "a.b.a"]
+        rng = random.Random(0)
+        for _ in range(20):
+            store = gila.Gila()
+            store.snapshot_env()
+            for _ in range(30):
+                key = rng.choice(keys)
+                action = rng.randrange(7)
+                if action == 0:
+                    store.set_default(key, rng.randrange(3))
+                elif action == 1:
+                    try:
+                        store.remove_default(key)
+                    except KeyError:
+                        pass
+                elif action == 2:
+                    store.override(key, rng.randrange(3))
+                elif action == 3:
+                    store.remove_override(key)
+                elif action == 4:
+                    store.bind_env(key)
+                elif action == 5:
+                    try:
+                        store.register_alias(key, rng.choice(keys))
+                    except gila.CircularReference:
+                        pass
+                else:
+                    store.deregister_alias(key)
+                incremental = dict(store.all_config())
+                store._Gila__rebuild_merged()
+                self.assertEqual(incremental, store._Gila__merged)
+                for key, value in flatten_dict(incremental, ".").items():
+                    if not isinstance(value, dict):
+                        self.assertEqual(store.get(key), value)
+
+    def test_all_config_nested(self):
+        gila.set_default("db.timeout", 5)
+        gila.set_default("db.host", "default")
+        gila.set_default("cache", {"size": 1})
+        gila.override("cache.ttl", 60)
+        gila.set_config_file("./tests/configs/json_config.json")
+        gila.read_config_file()
+        gila.override("meta", "shadowed")
+        self.assertEqual(gila.get("db.timeout"), 5)
+        all_conf = gila.all_config()
+        self.assertEqual(all_conf["db"], {"host": "default", "timeout": 5})
+        self.assertEqual(all_conf["cache"], {"ttl": 60})
+        self.assertEqual(all_conf["meta"], "shadowed")
+        self.assertEqual(all_conf["filetype"], "yaml")
+
+    def test_get_many(self):
+        gila.set_default("database.host", "localhost")
+        gila.set_default("database.port", 5432)
+        gila.override("database.port", 6543)
+        gila.set_default("shadowed", "value")
+        gila.override("debug", False)
+        keys = ["database.host", "database.port", "debug",
+                "shadowed.key", "missing", "database.host"]
+        values = gila.get_many(keys)
+        self.assertEqual(list(values), keys[0:-1])
+        for key in keys:
+            self.assertEqual(values[key], gila.get(key))
+
+    def test_get_many_shared_parents(self):
+        gila.set_default("first.inner.host", "one")
+        gila.set_default("first.inner.port", 1)
+        gila.set_default("second.inner.host", "two")
+        gila.set_default("second.inner.port", 2)
+        gila.override("first", "shadowed")
+        gila.register_alias("other", "second.inner.port")
+        keys = ["first.inner.host", "second.inner.host", "first.inner.port",
+                "second.inner.port", "other"]
+        values = gila.get_many(keys)
+        self.assertEqual(values, {key: gila.get(key) for key in keys})
+        self.assertEqual(values["second.inner.host"], "two")
+        self.assertIsNone(values["first.inner.port"])
+
+    def test_get_many_with_cache(self):
+        gila.enable_cache()
+        gila.set_default("database.host", "localhost")
+        self.assertEqual(gila.get("database.host"), "localhost")
+        values = gila.get_many(["database.host", "database.port"])
+        self.assertEqual(values, {"database.host": "localhost",
+                                  "database.port": None})
+        info = gila.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 2)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        gila.reset()
+
+    def test_snapshot_matches_get(self):
+        prefix = "GILA"
+        os_env[f'{prefix}_SNAP'] = "env"
+        os_env["GILA_SNAP_BOUND"] = "bound"
+        gila.set_env_prefix(prefix)
+        gila.automatic_env()
+        gila.bind_env("bound", "GILA_SNAP_BOUND")
+        gila.set_config_name('yaml_config')
+        gila.add_config_path('./tests/configs')
+        gila.read_config_file()
+        gila.set_default("database.host", "localhost")
+        gila.override("debug", False)
+        gila.register_alias("name", "meta.filename")
+
+        snapshot = gila.snapshot()
+        self.assertIsInstance(snapshot, gila.Snapshot)
+        keys = ["SNAP", "snap", "bound", "filetype", "meta", "meta.filename",
+                "database.host", "debug", "name", "missing", "exists.nested"]
+        for key in keys:
+            self.assertEqual(snapshot.get(key), gila.get(key), key)
+        self.assertEqual(snapshot.get_many(keys)["debug"], False)
+        self.assertTrue(snapshot.is_set("name"))
+        self.assertEqual(snapshot.all_config()["filetype"],
+                         gila.get("filetype"))
+
+    def test_snapshot_is_immutable(self):
+        gila.set_config_name('yaml_config')
+        gila.add_config_path('./tests/configs')
+        gila.read_config_file()
+        snapshot = gila.snapshot()
+        with self.assertRaises(TypeError):
+            snapshot.get("meta")["filename"] = "changed"
+        self.assertIsInstance(snapshot.get("contents"), tuple)
+        with self.assertRaises(TypeError):
+            snapshot.get("contents")[0]["name"] = "changed"
+        with self.assertRaises(AttributeError):
+            snapshot.generation = 0
+
+    def test_snapshot_unchanged_by_writes(self):
+        gila.override("key", "value")
+        snapshot = gila.snapshot()
+        gila.override("key", "new value")
+        gila.override("other", "value")
+        self.assertEqual(snapshot.get("key"), "value")
+        self.assertIsNone(snapshot.get("other"))
+        self.assertLess(snapshot.generation, gila.cache_info().generation)
+
+
+class TestThreadSafety(unittest.TestCase):
+
+    def setUp(self):
+        gila.reset()
+        gila.enable_thread_safety()
+
+    def test_reads_during_reloads(self):
+        gila.enable_cache()
+        gila.set_config_name('yaml_config')
+        gila.add_config_path('./tests/configs')
+        gila.read_config_file()
+        errors = []
+
+        def read():
+            for _ in range(2000):
+                if gila.get("meta.filename") != 'yaml_config':
+                    errors.append(gila.get("meta.filename"))
+
+        readers = [Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for _ in range(20):
+            gila.read_config_file()
+            gila.override("key", "value")
+            gila.remove_override("key")
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(gila.get_many(["exists"]), {"exists": True})
+        self.assertTrue(gila.in_config("exists"))
+        self.assertTrue(gila.is_set("exists"))
+
+    def test_targeted_invalidation_during_reads(self):
+        gila.enable_cache()
+        keys = [f"section{index}.key" for index in range(100)]
+        for key in keys:
+            gila.set_default(key, 0)
+        done = []
+
+        def read():
+            while not done:
+                for key in keys:
+                    gila.get(key)
+                    gila.get_int(key)
+
+        readers = [Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        try:
+            for value in range(1, 500):
+                gila.set_default(keys[value % len(keys)], value)
+        finally:
+            done.append(True)
+            for reader in readers:
+                reader.join()
+        for value in range(400, 500):
+            key = keys[value % len(keys)]
+            self.assertEqual(gila.get(key), gila.get_int(key))
+        self.assertEqual(gila.get(keys[99]), 499)
+
+
+class TestTypedAccessors(unittest.TestCase):
+    def setUp(self):
+        gila.reset()
+
+    def test_typed_values_from_strings(self):
+        gila.set_default("pool.size", "10")
+        gila.set_default("ratio", "0.5")
+        gila.set_default("debug", "Yes")
+        gila.set_default("timeout", "1m30s")
+        gila.set_default("hosts", "a, b,c")
+        self.assertEqual(gila.get_int("pool.size"), 10)
+        self.assertEqual(gila.get_float("ratio"), 0.5)
+        self.assertIs(gila.get_bool("debug"), True)
+        self.assertEqual(gila.get_duration("timeout"),
+                         timedelta(seconds=90))
+        self.assertEqual(gila.get_list("hosts"), ["a", "b", "c"])
+        self.assertIsNone(gila.get_int("missing"))
+
+    def test_typed_values_from_env(self):
+        os_env["GILA_TYPED_PORT"] = "8080"
+        gila.bind_env("port", "GILA_TYPED_PORT")
+        self.assertEqual(gila.get_int("port"), 8080)
+        os_env["GILA_TYPED_PORT"] = "9090"
+        self.assertEqual(gila.get_int("port"), 9090)
+
+    def test_typed_values_invalidated(self):
+        gila.enable_cache()
+        gila.set_default("pool.size", "10")
+        self.assertEqual(gila.get_int("pool.size"), 10)
+        self.assertEqual(gila.get_int("pool.size"), 10)
+        gila.override("pool", {"size": 20})
+        self.assertEqual(gila.get_int("pool.size"), 20)
+        gila.remove_override("pool")
+        self.assertEqual(gila.get_int("pool.size"), 10)
+        gila.set_default("pool.size", True)
+        self.assertEqual(gila.get_int("pool.size"), 1)
+
+    def test_typed_values_invalid(self):
+        gila.set_default("size", "ten")
+        with self.assertRaises(gila.InvalidConfigValue):
+            gila.get_int("size")
+        with self.assertRaises(ValueError):
+            gila.get_duration("size")
+        gila.set_default("size", ["a"])
+        with self.assertRaises(gila.InvalidConfigValue):
+            gila.get_bool("size")
+
+    def test_get_list_copy(self):
+        gila.set_default("hosts", "a,b")
+        gila.get_list("hosts").append("c")
+        self.assertEqual(gila.get_list("hosts"), ["a", "b"])
+
+
+class TestKeyHandle(unittest.TestCase):
+    def setUp(self):
+        gila.reset()
+
+    def test_key_handle_get(self):
+        handle = gila.key("database.host")
+        self.assertEqual(handle.key, "database.host")
+        self.assertIsNone(handle.get())
+        gila.set_default("database.host", "localhost")
+        self.assertEqual(handle.get(), "localhost")
+        gila.override("database", {"host": "remote"})
+        self.assertEqual(handle.get(), "remote")
+        gila.override("database", "shadowed")
+        self.assertIsNone(handle.get())
+        gila.remove_override("database")
+        self.assertEqual(handle.get(), "localhost")
+        gila.reset()
+        self.assertIsNone(handle.get())
+
+    def test_key_handle_unrelated_changes(self):
+        gila.set_default("database.host", "localhost")
+        handle = gila.key("database.host")
+        handle.get()
+        gila.set_default("database.port", 5432)
+        gila.set_default("debug", True)
+        self.assertEqual(handle.get(), "localhost")
+        gila.set_default("database.host", "remote")
+        self.assertEqual(handle.get(), "remote")
+
+    def test_key_handle_aliases_and_env(self):
+        gila.set_default("filetype", "yaml")
+        handle = gila.key("alias_filetype")
+        self.assertIsNone(handle.get())
+        gila.register_alias("alias_filetype", "filetype")
+        self.assertEqual(handle.get(), "yaml")
+        os_env["GILA_HANDLE_FILETYPE"] = "env"
+        gila.bind_env("filetype", "GILA_HANDLE_FILETYPE")
+        self.assertEqual(handle.get(), "env")
+        # Read live from os.environ
+        os_env["GILA_HANDLE_FILETYPE"] = "changed"
+        self.assertEqual(handle.get(), "changed")
+        gila.deregister_alias("alias_filetype")
+        self.assertIsNone(handle.get())
+
+    def test_key_handle_thread_safety(self):
+        gila.enable_thread_safety()
+        gila.set_default("key", "value")
+        handle = gila.key("key")
+        self.assertEqual(handle.get(), "value")
+        gila.set_default("key", "new value")
+        self.assertEqual(handle.get(), "new value")
+
+
+class TestLookupStats(unittest.TestCase):
+    def setUp(self):
+        gila.reset()
+
+    def tearDown(self):
+        for env_key in ("GILA_TEST_AUTO", "GILA_TEST_BOUND"):
+            os_env.pop(env_key, None)
+
+    def test_stats_disabled(self):
+        gila.get("key")
+        self.assertEqual(gila.stats(), (0, {}, {}, {}))
+        gila.reset_stats()
+        self.assertEqual(gila.stats().lookups, 0)
+
+    def test_stats_layers(self):
+        gila.set_config_name('json_config')
+        gila.add_config_path('./tests/configs')
+        gila.read_config_file()
+        gila.set_default("meta.missing", "default")
+        gila.set_default("filetype.missing", "default")
+        gila.override("overridden", 0)
+        os_env["GILA_TEST_AUTO"] = "auto"
+        os_env["GILA_TEST_BOUND"] = "bound"
+        gila.set_env_prefix("gila")
+        gila.automatic_env()
+        gila.bind_env("bound", "GILA_TEST_BOUND")
+        gila.register_alias("name", "meta.filename")
+        gila.enable_stats()
+
+        expected = {
+            "overridden": (0, "override"),
+            "test_auto": ("auto", "auto_env"),
+            "bound": ("bound", "bound_env"),
+            "name": ("json_config", "config"),
+            "meta.missing": ("default", "default"),
+            "filetype.missing": (None, "miss"),
+            "name.first": (None, "miss"),
+            "missing": (None, "miss"),
+        }
+        for key, (value, _) in expected.items():
+            self.assertEqual(gila.get(key), value)
+        gila.get("overridden")
+
+        stats = gila.stats()
+        self.assertEqual(stats.lookups, len(expected) + 1)
+        self.assertEqual(stats.keys["overridden"], {"override": 2})
+        for key, (_, layer) in expected.items():
+            self.assertIn(layer, stats.keys[key])
+        self.assertEqual(stats.layers["miss"], 3)
+        self.assertEqual(stats.layers["config"], 1)
+        self.assertEqual(sum(stats.latency.values()), stats.lookups)
+        for bound in stats.latency:
+            self.assertEqual(bound & (bound - 1), 0)
+
+        gila.reset_stats()
+        self.assertEqual(gila.stats().lookups, 0)
+        gila.get("bound")
+        self.assertEqual(gila.stats().layers, {"bound_env": 1})
+        gila.disable_stats()
+        gila.get("bound")
+        self.assertEqual(gila.stats().lookups, 0)
+
+    def test_stats_with_cache_and_threads(self):
+        gila.set_default("key", "value")
+        gila.enable_cache()
+        gila.enable_thread_safety()
+        gila.enable_stats()
+        for _ in range(3):
+            self.assertEqual(gila.get("key"), "value")
+        self.assertEqual(gila.stats().keys, {"key": {"default": 3}})
+
+
+class TestExplain(unittest.TestCase):
+    def setUp(self):
+        gila.reset()
+
+    def layers(self, explanation):
+        return [(step.layer, step.found, step.value, step.shadowed_by)
+                for step in explanation.steps]
+
+    def test_explain_found(self):
+        gila.set_default("database.host", "localhost")
+        gila.register_alias("host", "database.host")
+        explanation = gila.explain("host")
+        self.assertEqual(explanation.key, "host")
+        self.assertEqual(explanation.real_key, "database.host")
+        self.assertEqual(explanation.value, "localhost")
+        self.assertEqual(explanation.layer, "default")
+        self.assertEqual(self.layers(explanation), [
+            ("alias", False, "database.host", None),
+            ("override", False, None, None),
+            ("bound_env", False, None, None),
+            ("config", False, None, None),
+            ("default", True, "localhost", None),
+        ])
+        for step in explanation.steps:
+            self.assertGreaterEqual(step.seconds, 0)
+        self.assertAlmostEqual(
+            explanation.seconds,
+            sum(step.seconds for step in explanation.steps))
+
+    def test_explain_shadowed(self):
+        gila.set_config_name('json_config')
+        gila.add_config_path('./tests/configs')
+        gila.read_config_file()
+        gila.set_default("filetype.missing", "default")
+        gila.register_alias("name", "meta.filename")
+        # A prefix no other test sets, so the env can't resolve the keys
+        gila.set_env_prefix("gila_explain")
+        gila.automatic_env()
+
+        explanation = gila.explain("filetype.missing")
+        self.assertEqual(explanation.layer, "miss")
+        self.assertIsNone(explanation.value)
+        self.assertEqual(self.layers(explanation)[-1],
+                         ("config", False, None, "filetype"))
+        self.assertEqual(explanation.steps[2].layer, "auto_env")
+
+        explanation = gila.explain("name.first")
+        self.assertEqual(self.layers(explanation),
+                         [("alias", False, "name.first", "name")])
+
+        gila.override("meta", {"other": 0})
+        explanation = gila.explain("meta.filename")
+        self.assertEqual(self.layers(explanation)[-1],
+                         ("override", False, None, "meta"))
+        explanation = gila.explain("meta.other")
+        self.assertEqual((explanation.layer, explanation.value),
+                         ("override", 0))
+
+    def test_explain_matches_get(self):
+        gila.set_default("a.b", "default")
+        gila.override("c", "override")
+        gila.enable_cache()
+        for key in ("a.b", "a.b.c", "c", "c.d", "missing"):
+            self.assertEqual(gila.explain(key).value, gila.get(key))
+
+
+class TestAsyncio(unittest.TestCase):
+    def setUp(self):
+        gila.reset()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_aread_config_file(self):
+        gila.set_config_file('./tests/configs/yaml_config.yaml')
+        for processes in (False, True):
+            diff = self.loop.run_until_complete(
+                gila.aread_config_file(processes=processes))
+            self.assertEqual(gila.get("filetype"), "yaml")
+            self.assertEqual(bool(diff.added), not processes)
+
+    def test_aread_config_file_lazy(self):
+        gila.set_config_file('./tests/configs/json_config.json')
+        self.loop.run_until_complete(gila.aread_config_file(lazy=True))
+        self.assertEqual(gila.get("meta.filename"), "json_config")
+
+    def test_config_changes(self):
+        async def collect():
+            changes = gila.config_changes()
+            gila.set_config_file('./tests/configs/yaml_config.yaml')
+            await gila.aread_config_file()
+            gila.read_config_files(['./tests/configs/conf.d'])
+            gila.read_config_file()
+            changes.close()
+            gila.read_config_file()
+            return [change async for change in changes]
+
+        changes = self.loop.run_until_complete(collect())
+        filename = os.path.abspath('./tests/configs/yaml_config.yaml')
+        self.assertEqual([os.path.abspath(name) for name, _ in (
+            changes[0], changes[2])], [filename, filename])
+        self.assertEqual(changes[1][0], ('./tests/configs/conf.d',))
+        self.assertIn("filetype", changes[0][1].added)
+        self.assertEqual(changes[2][1], gila.ConfigDiff(set(), set(), set()))
+        self.assertEqual(len(changes), 3)
+
+
+class TestPrepareForFork(unittest.TestCase):
+    def setUp(self):
+        gila.reset()
+
+    def tearDown(self):
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+
+    def test_prepare_for_fork(self):
+        gila.set_config_name('json_config')
+        gila.add_config_path('./tests/configs')
+        gila.read_config_file()
+        gila.set_default("list.of.values", [1, {"nested": 2}])
+        gila.override("flags.overridden", True)
+        handle = gila.key("meta.filename")
+        before = {key: gila.get(key) for key in gila.all_config()}
+        self.assertEqual(handle.get(), "json_config")
+
+        gila.prepare_for_fork()
+        self.assertEqual({key: gila.get(key) for key in gila.all_config()},
+                         before)
+        self.assertEqual(handle.get(), "json_config")
+        self.assertEqual(gila.get("list.of.values"), [1, {"nested": 2}])
+        for key in gila.get("meta"):
+            self.assertIs(sys.intern(key), key)
+        if hasattr(gc, "get_freeze_count"):
+            self.assertGreater(gc.get_freeze_count(), 0)
+
+        gila.read_config_file()
+        gila.override("flags.overridden", False)
+        self.assertIs(gila.get("flags.overridden"), False)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_prepare_for_fork_workers(self):
+        gila.set_default("database.host", "localhost")
+        gila.prepare_for_fork()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                gc.collect()
+                if gila.get("database.host") == "localhost":
+                    status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+
 
 class TestOverrides(unittest.TestCase):
 
@@ -207,6 +831,46 @@ class TestReadConfigs(unittest.TestCase):
         gila.set_env_prefix(prefix)
         self.assertEqual(gila.get(key), var)
 
+    def test_auto_env_snapshot(self):
+        prefix = "GILA"
+        key = "SNAPSHOT"
+        var = "VALUES"
+        os_env[f'{prefix}_{key}'] = var
+        gila.automatic_env()
+        gila.snapshot_env()
+        gila.set_env_prefix(prefix)
+        self.assertEqual(gila.get(key), var)
+        self.assertEqual(gila.get(key.lower()), var)
+        os_env[f'{prefix}_{key}'] = var + "new"
+        self.assertEqual(gila.get(key), var)
+        gila.refresh_env()
+        self.assertEqual(gila.get(key), var + "new")
+
+    def test_auto_env_snapshot_shadowing(self):
+        prefix = "GILA"
+        os_env[f'{prefix}_SHADOWED'] = "value"
+        gila.set_default("shadowed.key", "default")
+        gila.set_env_prefix(prefix)
+        gila.automatic_env()
+        gila.snapshot_env()
+        self.assertIsNone(gila.get("shadowed.key"))
+        del os_env[f'{prefix}_SHADOWED']
+        gila.refresh_env()
+        self.assertEqual(gila.get("shadowed.key"), "default")
+
+    def test_bind_env_snapshot(self):
+        key = "gila_bound"
+        os_env[key.upper()] = "value"
+        gila.snapshot_env()
+        gila.bind_env(key)
+        self.assertEqual(gila.get(key), "value")
+        os_env[key.upper()] = "new value"
+        self.assertEqual(gila.get(key), "value")
+        gila.refresh_env()
+        self.assertEqual(gila.get(key), "new value")
+        gila.unbind_env(key)
+        self.assertIsNone(gila.get(key))
+
     def test_override_with_env(self):
         prefix = "GILA"
         key1 = "TEST1"
@@ -238,6 +902,81 @@ class TestReadConfigs(unittest.TestCase):
         self.assertEqual(gila.get("contents.filetype.value_type"), 'string')
         self.assertIsNone(gila.get("contents"))
 
+    def test_read_in_nested_shadowing(self):
+        gila.set_config_name('json_config')
+        gila.add_config_path('./tests/configs')
+        gila.read_config_file()
+        gila.set_default("meta.filename", "default")
+        gila.set_default("meta.missing", "default")
+        self.assertEqual(gila.get("meta.filename"), 'json_config')
+        self.assertEqual(gila.get("meta.missing"), 'default')
+        self.assertIsNone(gila.get("filetype.missing"))
+
+    def test_nested_shadowing_across_layers(self):
+        gila.set_default("db.primary.host", "default")
+        gila.set_default("cache.host", "default")
+        gila.bind_env("db.primary", "GILA_TEST_PRIMARY")
+        self.assertIsNone(gila.get("db.primary.host"))
+        gila.unbind_env("db.primary")
+        self.assertEqual(gila.get("db.primary.host"), "default")
+
+        os_env["GILA_CACHE"] = "redis"
+        try:
+            gila.set_env_prefix("gila")
+            gila.automatic_env()
+            self.assertIsNone(gila.get("cache.host"))
+            gila.snapshot_env()
+            self.assertIsNone(gila.get("cache.host"))
+            gila.override("db", {"replica": "override"})
+            self.assertIsNone(gila.get("db.primary.host"))
+        finally:
+            del os_env["GILA_CACHE"]
+
+    def test_read_in_conf_d(self):
+        diff = gila.read_config_files(['./tests/configs/conf.d'])
+        self.assertEqual(gila.get("service.name"), "api")
+        self.assertEqual(gila.get("service.port"), 8080)
+        self.assertEqual(gila.get("service.features.logging"), True)
+        self.assertEqual(gila.get("service.features.metrics"), True)
+        self.assertEqual(gila.get("region"), "us-east-1")
+        self.assertIn("service.port", diff.added)
+
+    def test_read_in_conf_d_order(self):
+        gila.read_config_files(['./tests/configs/conf.d/*.toml',
+                                './tests/configs/conf.d/*.yaml'],
+                               processes=True)
+        self.assertEqual(gila.get("service.name"), "base")
+        self.assertEqual(gila.get("region"), "none")
+        diff = gila.read_config_files(['./tests/configs/conf.d/*.toml',
+                                       './tests/configs/conf.d/*.yaml'])
+        self.assertEqual(diff, gila.ConfigDiff(set(), set(), set()))
+
+    def test_read_in_conf_d_errors(self):
+        with self.assertRaises(gila.ConfigFileNotFound):
+            gila.read_config_files(['./tests/configs/missing.d'])
+        with self.assertRaises(gila.ConfigNotSupported):
+            gila.read_config_files(['./tests/configs/conf.d/*'])
+
+    def test_config_path_listing_cached(self):
+        with TemporaryDirectory() as tempdir:
+            old = time.time() - 100
+            os.utime(tempdir, (old, old))
+            gila.set_config_name('app')
+            gila.add_config_path(tempdir)
+            with self.assertRaises(gila.ConfigFileNotFound):
+                gila.read_config_file()
+            self.assertIn(tempdir, gila.gila._dir_listings)
+
+            with open(os.path.join(tempdir, 'app.json'), 'w') as config:
+                config.write('{"key": "value"}')
+            # The listing is only scanned again once the mtime changes
+            os.utime(tempdir, (old, old))
+            with self.assertRaises(gila.ConfigFileNotFound):
+                gila.read_config_file()
+            os.utime(tempdir, (old + 1, old + 1))
+            gila.read_config_file()
+            self.assertEqual(gila.get("key"), "value")
+
     def test_read_in_json(self):
         gila.set_config_name('json_config')
         gila.add_config_path('./tests/configs')
@@ -246,6 +985,75 @@ class TestReadConfigs(unittest.TestCase):
         self.assertEqual(gila.get("meta.filename"), 'json_config')
         self.assertIsInstance(gila.get("contents"), list)
 
+    def test_read_in_json_lazy(self):
+        gila.set_config_name('json_config')
+        gila.add_config_path('./tests/configs')
+        diff = gila.read_config_file(lazy=True)
+        self.assertEqual(diff.added, {"exists", "filetype", "meta",
+                                      "contents"})
+        self.assertTrue(gila.in_config("meta"))
+        self.assertEqual(gila.get("exists"), True)
+        self.assertEqual(gila.get("meta.filename"), 'json_config')
+        gila.set_default("meta.missing", "default")
+        gila.set_default("exists.missing", "default")
+        self.assertEqual(gila.get("meta.missing"), 'default')
+        self.assertIsNone(gila.get("exists.missing"))
+        self.assertEqual(gila.all_config()["meta"],
+                         {"filename": "json_config", "missing": "default"})
+
+    def test_read_in_json_lazy_dotted_keys(self):
+        with TemporaryDirectory() as tempdir:
+            filepath = os.path.join(tempdir, 'config.json')
+            with open(filepath, 'w') as config:
+                config.write('{"c.c": 2, "d": {"e.f": {"g": 3}}}')
+            gila.set_config_file(filepath)
+            for lazy in (False, True):
+                gila.read_config_file(lazy=lazy)
+                self.assertEqual(gila.get("c.c"), 2)
+                self.assertEqual(gila.get("d.e.f.g"), 3)
+                self.assertIsNone(gila.get("c"))
+
+    def test_read_in_lazy_then_eager(self):
+        gila.set_config_name('json_config')
+        gila.add_config_path('./tests/configs')
+        gila.enable_cache()
+        gila.read_config_file(lazy=True)
+        self.assertEqual(gila.get("meta.filename"), 'json_config')
+        diff = gila.read_config_file()
+        self.assertIn("meta.filename", diff.added)
+        self.assertEqual(gila.get("meta.filename"), 'json_config')
+        gila.read_config_file(lazy=True)
+        self.assertEqual(gila.get("meta.filename"), 'json_config')
+        self.assertEqual(gila.snapshot().get("meta.filename"), 'json_config')
+
+    def test_read_in_nested_merging(self):
+        with TemporaryDirectory() as tempdir:
+            for name, contents in [
+                    ('base.json', '{"db": {"host": "local", "port": 1}}'),
+                    ('prod.json', '{"db": {"host": "remote"}}')]:
+                filepath = os.path.join(tempdir, name)
+                with open(filepath, 'w') as config:
+                    config.write(contents)
+                gila.set_config_file(filepath)
+                gila.read_config_file(lazy=name == 'base.json')
+            self.assertEqual(gila.get("db.host"), "remote")
+            self.assertEqual(gila.get("db.port"), 1)
+            self.assertEqual(gila.all_config()["db"],
+                             {"host": "remote", "port": 1})
+            diff = gila.read_config_file()
+            self.assertEqual(diff, gila.ConfigDiff(set(), set(), set()))
+            gila.set_config_file(os.path.join(tempdir, 'base.json'))
+            diff = gila.read_config_file()
+            self.assertEqual(diff.added, {"db.port"})
+            self.assertEqual(diff.changed, {"db", "db.host"})
+            self.assertEqual(gila.get("db.host"), "local")
+
+    def test_read_in_lazy_not_json(self):
+        gila.set_config_name('yaml_config')
+        gila.add_config_path('./tests/configs')
+        with self.assertRaises(gila.ConfigNotSupported):
+            gila.read_config_file(lazy=True)
+
     def test_read_in_toml(self):
         gila.set_config_name('toml_config')
         gila.add_config_path('./tests/configs')
@@ -269,5 +1077,145 @@ class TestReadConfigs(unittest.TestCase):
         self.assertEqual(gila.get("EXISTS"), 'True')
 
 
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        gila.reset()
+        gila.enable_cache()
+
+    def test_cache_hits(self):
+        key = "key"
+        value = "value"
+        gila.override(key, value)
+        self.assertEqual(gila.get(key), value)
+        self.assertEqual(gila.get(key), value)
+        info = gila.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.size, 1)
+
+    def test_cache_invalidated_by_mutators(self):
+        key = "filetype"
+        gila.set_default(key, "default")
+        self.assertEqual(gila.get(key), "default")
+        generation = gila.cache_info().generation
+
+        gila.set_config_name('yaml_config')
+        gila.add_config_path('./tests/configs')
+        gila.read_config_file()
+        self.assertEqual(gila.get(key), "yaml")
+
+        os_env[key.upper()] = "env"
+        self.addCleanup(os_env.pop, key.upper(), None)
+        gila.bind_env(key)
+        self.assertEqual(gila.get(key), "env")
+
+        gila.override(key, "override")
+        self.assertEqual(gila.get(key), "override")
+
+        alias = "alias_filetype"
+        self.assertIsNone(gila.get(alias))
+        gila.register_alias(alias, key)
+        self.assertEqual(gila.get(alias), "override")
+
+        gila.remove_override(key)
+        self.assertEqual(gila.get(alias), "env")
+        self.assertGreater(gila.cache_info().generation, generation)
+
+    def test_remove_missing_default(self):
+        handle = gila.key("d")
+        self.assertIsNone(handle.get())
+        self.assertIsNone(gila.get("d"))
+        with self.assertRaises(KeyError):
+            gila.remove_default("d.x")
+        self.assertIsNone(gila.get("d"))
+        self.assertIsNone(handle.get())
+        self.assertNotIn("d", gila.all_config())
+        gila.set_default("d.x", 1)
+        gila.remove_default("d.x")
+        self.assertEqual(gila.get("d"), {})
+        self.assertEqual(handle.get(), {})
+
+    def test_cache_targeted_invalidation(self):
+        gila.set_default("database.host", "localhost")
+        gila.set_default("database.port", 5432)
+        gila.set_default("debug", False)
+        gila.get_many(["database.host", "database.port", "debug"])
+        gila.override("debug", True)
+        self.assertEqual(gila.cache_info().size, 2)
+        self.assertTrue(gila.get("debug"))
+        gila.set_default("database.host", "remote")
+        self.assertEqual(gila.cache_info().size, 2)
+        self.assertEqual(gila.get("database.host"), "remote")
+        gila.set_default("database", {})
+        self.assertEqual(gila.cache_info().size, 1)
+
+    def test_read_config_diff(self):
+        gila.set_config_name('yaml_config')
+        gila.add_config_path('./tests/configs')
+        diff = gila.read_config_file()
+        self.assertIn("meta.filename", diff.added)
+        self.assertIn("meta", diff.added)
+        self.assertEqual(diff.removed, set())
+        self.assertEqual(gila.get("meta.filename"), "yaml_config")
+        self.assertEqual(gila.get("exists"), True)
+        self.assertEqual(gila.read_config_file(),
+                         gila.ConfigDiff(set(), set(), set()))
+        self.assertEqual(gila.cache_info().size, 2)
+
+    def test_read_config_respelled(self):
+        # The same value under a dotted key instead of a nested one
+        with TemporaryDirectory() as tempdir:
+            filepath = os.path.join(tempdir, 'config.json')
+            gila.set_config_file(filepath)
+            with open(filepath, 'w') as config:
+                config.write('{"b": {"b": 0}}')
+            gila.read_config_file()
+            handle = gila.key("b")
+            self.assertEqual(gila.get("b"), {"b": 0})
+            self.assertEqual(handle.get(), {"b": 0})
+            with open(filepath, 'w') as config:
+                config.write('{"b.b": 0}')
+            diff = gila.read_config_file()
+            self.assertEqual(diff.removed, {"b"})
+            self.assertIsNone(gila.get("b"))
+            self.assertIsNone(handle.get())
+            self.assertEqual(gila.get("b.b"), 0)
+
+    def test_read_config_mixed_spellings(self):
+        with TemporaryDirectory() as tempdir:
+            filepath = os.path.join(tempdir, 'config.json')
+            gila.set_config_file(filepath)
+            handle = gila.key("a")
+            for contents in ['{"a": {"b": 2, "c": 1}}',
+                             '{"a.b": 0, "a": {"b": 2, "c": 1}}',
+                             '{"a.b": 0, "a": {"c": 1}}',
+                             '{"a": {"b": 0}}']:
+                with open(filepath, 'w') as config:
+                    config.write(contents)
+                gila.read_config_file()
+                self.assertEqual(gila.get("a"), gila.explain("a").value)
+                self.assertEqual(handle.get(), gila.get("a"))
+                fresh = gila.Gila()
+                fresh.set_config_file(filepath)
+                fresh.read_config_file()
+                self.assertEqual(gila.all_config(), fresh.all_config())
+
+    def test_cache_cleared_on_reset(self):
+        gila.override("key", "value")
+        self.assertEqual(gila.get("key"), "value")
+        gila.reset()
+        self.assertIsNone(gila.get("key"))
+        self.assertEqual(gila.cache_info().size, 0)
+
+    def test_disable_cache(self):
+        gila.override("key", "value")
+        gila.get("key")
+        gila.disable_cache()
+        self.assertEqual(gila.cache_info().size, 0)
+        gila.get("key")
+        self.assertEqual(gila.cache_info().size, 0)
+
+
 if __name__ == '__main__':
     unittest.main()
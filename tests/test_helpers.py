@@ -1,6 +1,9 @@
 import unittest
+from datetime import timedelta
 
-from gila.util.helpers import deep_search, dict_merge
+from gila.util.helpers import (deep_search, dict_merge, deep_merge,
+                               flatten_dict, diff_flat_dicts, to_int,
+                               to_float, to_bool, to_duration, to_list)
 from gila.gila import _allowed_falsy_values
 
 
@@ -82,5 +85,175 @@ class TestDictMerge(unittest.TestCase):
         self.assertEqual(merged_dict, dict_1)
 
 
+class TestDeepMerge(unittest.TestCase):
+
+    def test_deep_merge_nested(self):
+        dict_1 = {'db': {'host': 'remote', 'pool': {'size': 10}}, 'new': 1}
+        dict_2 = {'db': {'host': 'local', 'port': 5432}, 'debug': False}
+        self.assertEqual(deep_merge(dict_1, dict_2), {
+            'db': {'host': 'remote', 'port': 5432, 'pool': {'size': 10}},
+            'debug': False,
+            'new': 1,
+        })
+        self.assertEqual(dict_2, {'db': {'host': 'local', 'port': 5432},
+                                  'debug': False})
+
+    def test_deep_merge_shares_subtrees(self):
+        dict_1 = {'changed': {'key': 2}, 'added': {'key': 3}}
+        dict_2 = {'changed': {'key': 1}, 'unchanged': {'key': 1}}
+        merged = deep_merge(dict_1, dict_2)
+        self.assertIs(merged['unchanged'], dict_2['unchanged'])
+        self.assertIs(merged['added'], dict_1['added'])
+        self.assertIs(deep_merge({}, dict_2), dict_2)
+        self.assertIs(deep_merge(dict_1, {}), dict_1)
+        # Nothing changes, so nothing is copied
+        same = {'changed': dict_2['changed']}
+        self.assertIs(deep_merge(same, dict_2), dict_2)
+
+    def test_deep_merge_with_falsy_values(self):
+        dict_1, dict_2 = ({}, {})
+        for index, falsy_value in enumerate(_allowed_falsy_values):
+            dict_1[index] = falsy_value
+            dict_2[index] = 'value to overwrite'
+        self.assertEqual(deep_merge(dict_1, dict_2), dict_1)
+
+
+class TestConversions(unittest.TestCase):
+
+    def test_to_int(self):
+        self.assertEqual(to_int(" 42 "), 42)
+        self.assertEqual(to_int(3.0), 3)
+        self.assertEqual(to_int(False), 0)
+        for invalid in ["4.2", 4.2, None, "0x10"]:
+            with self.assertRaises((TypeError, ValueError)):
+                to_int(invalid)
+
+    def test_to_float(self):
+        self.assertEqual(to_float("1e3"), 1000.0)
+        self.assertEqual(to_float(2), 2.0)
+        with self.assertRaises(TypeError):
+            to_float([1])
+
+    def test_to_bool(self):
+        for true in [True, 1, "1", "TRUE", " on ", "y"]:
+            self.assertIs(to_bool(true), True)
+        for false in [False, 0, "0", "False", "off", "n"]:
+            self.assertIs(to_bool(false), False)
+        for invalid in [2, "maybe", None, ""]:
+            with self.assertRaises(ValueError):
+                to_bool(invalid)
+
+    def test_to_duration(self):
+        self.assertEqual(to_duration("1h30m"), timedelta(minutes=90))
+        self.assertEqual(to_duration("1.5s"), timedelta(seconds=1.5))
+        self.assertEqual(to_duration("-300ms"),
+                         timedelta(milliseconds=-300))
+        self.assertEqual(to_duration("2us"), timedelta(microseconds=2))
+        self.assertEqual(to_duration("2\u00b5s"), timedelta(microseconds=2))
+        self.assertEqual(to_duration("10"), timedelta(seconds=10))
+        self.assertEqual(to_duration(2.5), timedelta(seconds=2.5))
+        for invalid in ["", "h", "1h 2m", "1.2.3s", "5d", True]:
+            with self.assertRaises((TypeError, ValueError)):
+                to_duration(invalid)
+
+    def test_to_list(self):
+        self.assertEqual(to_list("a, b ,c"), ["a", "b", "c"])
+        self.assertEqual(to_list(" "), [])
+        self.assertEqual(to_list(("a", 1)), ["a", 1])
+        with self.assertRaises(TypeError):
+            to_list(1)
+
+
+class TestFlattenDict(unittest.TestCase):
+
+    def test_non_dict_haystack(self):
+        with self.assertRaises(TypeError):
+            flatten_dict('test string', '.')
+
+    def test_flatten_nested(self):
+        haystack = {
+            'foo': {
+                'bar': {
+                    'baz': 1
+                }
+            },
+            'test': False
+        }
+        index = flatten_dict(haystack, '.')
+        self.assertEqual(index['foo.bar.baz'], 1)
+        self.assertIs(index['foo.bar'], haystack['foo']['bar'])
+        self.assertIs(index['foo'], haystack['foo'])
+        self.assertFalse(index['test'])
+
+    def test_flatten_mixed_dotted_keys(self):
+        haystack = {
+            'foo': {
+                'bar.baz': {
+                    'qux': 1
+                }
+            },
+            'a.b': {
+                'c': 2
+            }
+        }
+        index = flatten_dict(haystack, '.')
+        self.assertEqual(index['foo.bar.baz.qux'], 1)
+        self.assertEqual(index['a.b.c'], 2)
+        self.assertNotIn('a', index)
+
+    def test_flatten_longest_key_wins(self):
+        haystack = {
+            'foo': {
+                'bar': 2,
+                'baz': {
+                    'qux': 3
+                }
+            },
+            'foo.bar': 1,
+            'foo.baz.qux': 4
+        }
+        index = flatten_dict(haystack, '.')
+        self.assertEqual(index['foo.bar'], 1)
+        self.assertEqual(index['foo.baz.qux'], 4)
+
+
+class TestDiffFlatDicts(unittest.TestCase):
+
+    def test_diff(self):
+        old = flatten_dict({
+            'same': {'key': 1},
+            'changed': {'key': 1, 'type': 1},
+            'removed': {'key': 1},
+            'replaced': {'key': 1},
+        }, '.')
+        new = flatten_dict({
+            'same': {'key': 1},
+            'changed': {'key': 2, 'type': True},
+            'added': {'key': 1},
+            'replaced': 'value',
+        }, '.')
+        added, removed, changed = diff_flat_dicts(old, new)
+        self.assertEqual(added, {'added', 'added.key', 'replaced'})
+        self.assertEqual(removed, {'removed', 'removed.key', 'replaced.key'})
+        self.assertEqual(changed, {'changed', 'changed.key', 'changed.type'})
+
+    def test_diff_dotted_keys(self):
+        old = flatten_dict({'b': {'b': 0}, 'c.c': 1}, '.')
+        new = flatten_dict({'b.b': 0, 'c': {'c': 1}}, '.')
+        self.assertEqual(diff_flat_dicts(old, new),
+                         ({'c'}, {'b'}, set()))
+
+    def test_diff_shadowed_spelling(self):
+        # a.b is spelled twice, and the index keeps the dotted one
+        old = flatten_dict({'a.b': 0, 'a': {'b': 2, 'c': 1}}, '.')
+        new = flatten_dict({'a.b': 0, 'a': {'c': 1}}, '.')
+        self.assertEqual(diff_flat_dicts(old, new), (set(), set(), {'a'}))
+
+    def test_no_diff(self):
+        index = flatten_dict({'foo': {'bar': [1, 2]}, 'empty': {}}, '.')
+        self.assertEqual(diff_flat_dicts(index, dict(index)),
+                         (set(), set(), set()))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from gila.util.errors import ConfigFileNotFound
+from gila.util.helpers import flatten_dict
+from gila.util.lazy import LazyJSON
+
+
+class TestLazyJSON(unittest.TestCase):
+
+    config = {
+        "service": {
+            "routes": [{"path": "/]}\"{", "weight": 1.5}],
+            "name": "api\\\"",
+            "limits": {"rps": 100, "burst": None},
+        },
+        "region": "us-east-1",
+        "replicas": 0,
+        "empty": {},
+    }
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.filepath = os.path.join(self.tempdir.name, 'config.json')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def write(self, contents):
+        with open(self.filepath, 'w') as json_config:
+            json_config.write(contents)
+
+    def test_matches_json(self):
+        for indent in (None, 4):
+            self.write(json.dumps(self.config, indent=indent))
+            lazy = LazyJSON(self.filepath)
+            self.assertEqual(lazy.materialize(), self.config)
+            self.assertEqual(list(lazy), list(self.config))
+
+    def test_resolve(self):
+        self.write(json.dumps(self.config))
+        lazy = LazyJSON(self.filepath)
+        self.assertEqual(lazy.resolve(["service", "limits", "rps"]),
+                         (100, False))
+        self.assertEqual(lazy.resolve(["service", "name"]),
+                         ("api\\\"", False))
+        self.assertEqual(lazy.resolve(["service", "missing", "key"]),
+                         (None, False))
+        self.assertEqual(lazy.resolve(["region", "key"]), (None, True))
+        self.assertEqual(lazy.resolve(["replicas", "key"]), (None, False))
+        self.assertEqual(lazy.resolve(["service", "name", "key"]),
+                         (None, True))
+
+    def test_resolve_dotted_keys(self):
+        config = {
+            "a.b": 1,
+            "a": {"b": 2, "c.d": {"e": 3}, "c": {"d": {"f": 4}}},
+            "g": {"h.i": {"j.k": 5}},
+            "l.m": {"n": 6},
+        }
+        self.write(json.dumps(config))
+        lazy = LazyJSON(self.filepath)
+        index = flatten_dict(config, '.')
+        self.assertEqual(lazy.resolve(["a", "b"]), (1, False))
+        self.assertEqual(lazy.resolve(["a", "c", "d", "f"]), (4, False))
+        for key, value in index.items():
+            self.assertEqual(lazy.resolve(key.split('.')), (value, False))
+        self.assertEqual(lazy.resolve(["l"]), (None, False))
+        self.assertEqual(lazy.resolve(["a/b"], '/'), (None, False))
+
+    def test_rewritten_in_place(self):
+        # Spans many pages, so the subtree looked up last is past the end
+        # of the rewritten file
+        config = {f"s{index}": {"k": {"v": index}} for index in range(20000)}
+        self.write(json.dumps(config))
+        lazy = LazyJSON(self.filepath)
+        self.assertEqual(lazy.resolve(["s1", "k", "v"]), (1, False))
+        self.write('{"s1": {"k": {"v": 2}}}')
+        with self.assertRaises(ConfigFileNotFound):
+            lazy.resolve(["s19999", "k", "v"])
+        self.assertEqual(lazy.resolve(["s1", "k", "v"]), (1, False))
+        self.assertEqual(LazyJSON(self.filepath).resolve(["s1", "k", "v"]),
+                         (2, False))
+
+    def test_parses_only_touched_subtrees(self):
+        # The malformed value is never looked up, so it never fails
+        self.write('{"good": {"key": 1}, "bad": {"key": [1, 2 3]}}')
+        lazy = LazyJSON(self.filepath)
+        self.assertEqual(lazy.resolve(["good", "key"]), (1, False))
+        with self.assertRaises(ValueError):
+            lazy.resolve(["bad", "key"])
+
+    def test_invalid_structure(self):
+        for contents in ['[1, 2]', '{"key": 1', '{"key" 1}', '{"key": "1}',
+                         '{"key": 1} extra', '']:
+            self.write(contents)
+            with self.assertRaises(ValueError):
+                LazyJSON(self.filepath)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from threading import Thread, Event
+
+from gila.util.locks import StampedLock
+
+
+class TestStampedLock(unittest.TestCase):
+
+    def test_reentrant_write(self):
+        lock = StampedLock()
+        with lock.write():
+            with lock.write():
+                self.assertEqual(lock.read(lambda: 'read'), 'read')
+        self.assertEqual(lock.read(lambda: 'read'), 'read')
+
+    def test_read_retried_during_write(self):
+        lock = StampedLock()
+        state = {'value': 1}
+        calls = []
+        started = Event()
+
+        def read():
+            calls.append(state['value'])
+            if len(calls) == 1:
+                started.set()
+                writer.join()
+            return state['value']
+
+        def write():
+            started.wait()
+            with lock.write():
+                state['value'] = 2
+
+        writer = Thread(target=write)
+        writer.start()
+        self.assertEqual(lock.read(read), 2)
+        self.assertEqual(calls, [1, 2])
+
+    def test_read_error_raised_without_write(self):
+        lock = StampedLock()
+        with self.assertRaises(KeyError):
+            lock.read({}.__getitem__, 'missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import gila
+from gila.util.helpers import json_to_dict
+from gila.util.parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.filepath = os.path.join(self.tempdir.name, 'config.json')
+        self.write('{"key": "value"}')
+        self.calls = 0
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def write(self, contents):
+        with open(self.filepath, 'w') as json_config:
+            json_config.write(contents)
+
+    def resolver(self, filepath):
+        self.calls += 1
+        return json_to_dict(filepath)
+
+    def test_cache_next_to_file(self):
+        cache = ParseCache()
+        self.assertEqual(cache.load(self.resolver, self.filepath),
+                         {"key": "value"})
+        self.assertEqual(cache.load(self.resolver, self.filepath),
+                         {"key": "value"})
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.tempdir.name, '.config.json.gila-cache')))
+
+    def test_cache_dir_invalidated_by_change(self):
+        cache = ParseCache(os.path.join(self.tempdir.name, 'cache'))
+        cache.load(self.resolver, self.filepath)
+        stat = os.stat(self.filepath)
+        # Same size and modification time, only the contents differ
+        self.write('{"key": "other"}')
+        os.utime(self.filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(cache.load(self.resolver, self.filepath),
+                         {"key": "other"})
+        self.assertEqual(self.calls, 2)
+
+    def test_unparseable_file_not_cached(self):
+        cache = ParseCache()
+        self.write('{"key": ')
+        self.assertIsNone(cache.load(self.resolver, self.filepath))
+        self.assertIsNone(cache.load(self.resolver, self.filepath))
+        self.assertEqual(self.calls, 2)
+
+    def test_read_config_file(self):
+        gila.reset()
+        gila.enable_parse_cache(os.path.join(self.tempdir.name, 'cache'))
+        gila.set_config_file(self.filepath)
+        gila.read_config_file()
+        self.assertEqual(gila.get("key"), "value")
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.tempdir.name, 'cache'))), 1)
+        gila.reset()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from gila import Gila, SharedSnapshot
+
+
+class TestSharedSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'config')
+        self.gila = Gila()
+        self.gila.set_default("database.host", "localhost")
+        self.gila.set_default("database.ports", [5432, 5433])
+        self.gila.override("debug", False)
+        self.gila.register_alias("host", "database.host")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_get(self):
+        self.assertEqual(self.gila.publish_snapshot(self.path), 1)
+        shared = SharedSnapshot(self.path)
+        self.assertEqual(shared.generation, 1)
+        self.assertEqual(shared.get("database.host"), "localhost")
+        self.assertEqual(shared.get("host"), "localhost")
+        self.assertEqual(shared.get("database"),
+                         {"host": "localhost", "ports": [5432, 5433]})
+        self.assertIs(shared.get("debug"), False)
+        self.assertIsNone(shared.get("missing"))
+        self.assertTrue(shared.is_set("database.host"))
+        self.assertFalse(shared.is_set("missing"))
+        self.assertEqual(shared.get_many(["host", "missing"]),
+                         {"host": "localhost", "missing": None})
+        self.assertEqual(shared.all_config(), dict(self.gila.all_config()))
+
+        # Values are copies
+        shared.get("database.ports").append(1)
+        self.assertEqual(shared.get("database.ports"), [5432, 5433])
+        shared.close()
+
+    def test_many_keys(self):
+        for index in range(1000):
+            self.gila.set_default(f"section{index % 7}.key{index}", index)
+        self.gila.publish_snapshot(self.path)
+        shared = SharedSnapshot(self.path)
+        for index in range(1000):
+            self.assertEqual(shared.get(f"section{index % 7}.key{index}"),
+                             index)
+        self.assertIsNone(shared.get("section0.key1"))
+        shared.close()
+
+    def test_refresh(self):
+        with self.assertRaises(FileNotFoundError):
+            SharedSnapshot(self.path)
+        self.gila.publish_snapshot(self.path)
+        shared = SharedSnapshot(self.path)
+        self.assertFalse(shared.refresh())
+
+        self.gila.override("database.host", "remote")
+        self.assertEqual(self.gila.publish_snapshot(self.path), 2)
+        self.assertEqual(shared.latest_generation, 2)
+        self.assertEqual(shared.get("host"), "localhost")
+        self.assertFalse(os.path.exists(f"{self.path}.1"))
+        self.assertTrue(shared.refresh())
+        self.assertEqual(shared.generation, 2)
+        self.assertEqual(shared.get("host"), "remote")
+        shared.close()
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_forked_worker(self):
+        self.gila.publish_snapshot(self.path)
+        attached_read, attached_write = os.pipe()
+        published_read, published_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                shared = SharedSnapshot(self.path)
+                os.write(attached_write, b"1")
+                os.read(published_read, 1)
+                if shared.refresh() and shared.get("host") == "remote":
+                    status = 0
+            finally:
+                os._exit(status)
+        os.read(attached_read, 1)
+        self.gila.override("database.host", "remote")
+        self.gila.publish_snapshot(self.path)
+        os.write(published_write, b"1")
+        _, status = os.waitpid(pid, 0)
+        for fd in (attached_read, attached_write, published_read,
+                   published_write):
+            os.close(fd)
+        self.assertEqual(status, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from gila.util.trie import KeyTrie, shadowing_parent
+
+
+class TestKeyTrie(unittest.TestCase):
+
+    def test_shadowing_parent(self):
+        trie = KeyTrie(["db", "service.name", "a.b.c"])
+        self.assertEqual(trie.shadowing_parent(["db", "host"]), "db")
+        self.assertEqual(
+            trie.shadowing_parent(["service", "name", "first"]),
+            "service.name")
+        self.assertEqual(trie.shadowing_parent(["a", "b", "c", "d", "e"]),
+                         "a.b.c")
+        self.assertIsNone(trie.shadowing_parent(["db"]))
+        self.assertIsNone(trie.shadowing_parent(["service", "name"]))
+        self.assertIsNone(trie.shadowing_parent(["a", "b", "x"]))
+        self.assertIsNone(trie.shadowing_parent(["missing", "key"]))
+
+    def test_delim(self):
+        trie = KeyTrie(delim="/")
+        trie.add("db/primary")
+        self.assertEqual(trie.shadowing_parent(["db", "primary", "host"]),
+                         "db/primary")
+        self.assertIsNone(trie.shadowing_parent(["db.primary", "host"]))
+
+    def test_shadowing_parent_in_nested_dict(self):
+        nested = {"db": {"host": "localhost", "port": 0, "pool": {}},
+                  "name": "app"}
+        self.assertEqual(shadowing_parent(nested, ["name", "first"], "."),
+                         "name")
+        self.assertEqual(
+            shadowing_parent(nested, ["db", "host", "ip", "v4"], "."),
+            "db.host")
+        # Empty values don't shadow their children
+        self.assertIsNone(shadowing_parent(nested, ["db", "port", "x"], "."))
+        self.assertIsNone(shadowing_parent(nested, ["db", "pool", "x"], "."))
+        self.assertIsNone(shadowing_parent(nested, ["db", "host"], "."))
+        self.assertIsNone(shadowing_parent(nested, ["missing", "x"], "."))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from threading import Event
+
+import gila
+from gila.util.watcher import ConfigWatcher
+
+
+def write_config(filepath, config):
+    # Written the way most editors save, a temporary file renamed over it
+    with open(filepath + '.tmp', 'w') as json_config:
+        json.dump(config, json_config)
+    os.replace(filepath + '.tmp', filepath)
+
+
+class TestConfigWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.filepath = os.path.join(self.tempdir.name, 'config.json')
+        write_config(self.filepath, {'key': 'value'})
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def check_watcher(self, **kwargs):
+        changed = Event()
+        watcher = ConfigWatcher(self.filepath, changed.set, debounce=0.05,
+                                **kwargs)
+        watcher.start()
+        try:
+            with open(os.path.join(self.tempdir.name, 'other'), 'w') as other:
+                other.write('not watched')
+            self.assertFalse(changed.wait(0.3))
+            write_config(self.filepath, {'key': 'new value'})
+            self.assertTrue(changed.wait(5))
+        finally:
+            watcher.stop()
+            watcher.join(5)
+        self.assertFalse(watcher.is_alive())
+
+    def test_inotify(self):
+        self.check_watcher()
+
+    def test_polling(self):
+        self.check_watcher(use_inotify=False, poll_interval=0.05)
+
+
+class TestWatchConfig(unittest.TestCase):
+
+    def setUp(self):
+        gila.reset()
+        self.tempdir = TemporaryDirectory()
+        self.filepath = os.path.join(self.tempdir.name, 'config.json')
+        write_config(self.filepath, {'key': 'value', 'removed': True})
+
+    def tearDown(self):
+        gila.reset()
+        self.tempdir.cleanup()
+
+    def test_hot_reload(self):
+        reloaded = Event()
+        files = []
+
+        def callback(filename, diff):
+            files.append((filename, diff))
+            reloaded.set()
+
+        gila.set_config_file(self.filepath)
+        gila.read_config_file()
+        gila.watch_config(callback, debounce=0.05)
+        write_config(self.filepath, {'key': 'new value'})
+        self.assertTrue(reloaded.wait(5))
+        self.assertEqual(files, [(self.filepath, gila.ConfigDiff(
+            added=set(), removed={'removed'}, changed={'key'}))])
+        self.assertEqual(gila.get('key'), 'new value')
+        self.assertIsNone(gila.get('removed'))
+
+    def test_unreadable_change_keeps_watching(self):
+        reloaded = Event()
+        gila.set_config_file(self.filepath)
+        gila.read_config_file()
+        gila.watch_config(lambda *_: reloaded.set(), debounce=0.05)
+        write_config(self.filepath, ['not', 'a', 'mapping'])
+        self.assertFalse(reloaded.wait(0.5))
+        self.assertEqual(gila.get('key'), 'value')
+        write_config(self.filepath, {'key': 'new value'})
+        self.assertTrue(reloaded.wait(5))
+        self.assertEqual(gila.get('key'), 'new value')
+
+    def test_failing_callback_keeps_watching(self):
+        reloaded = Event()
+        calls = []
+
+        def callback(filename, diff):
+            calls.append(diff)
+            if len(calls) == 1:
+                raise RuntimeError('callback failed')
+            reloaded.set()
+
+        gila.set_config_file(self.filepath)
+        gila.read_config_file()
+        gila.watch_config(callback, debounce=0.05)
+        with self.assertLogs('gila.util.watcher', 'ERROR') as logs:
+            write_config(self.filepath, {'key': 'new value'})
+            # The handler records the message before formatting it
+            for _ in range(100):
+                if logs.output:
+                    break
+                reloaded.wait(0.05)
+        self.assertIn('callback failed', logs.output[0])
+        write_config(self.filepath, {'key': 'newer value'})
+        self.assertTrue(reloaded.wait(5))
+        self.assertEqual(gila.get('key'), 'newer value')
+        self.assertEqual(len(calls), 2)
+
+    def test_unwatch(self):
+        reloaded = Event()
+        gila.set_config_file(self.filepath)
+        gila.read_config_file()
+        gila.watch_config(lambda *_: reloaded.set(), debounce=0.05)
+        gila.unwatch_config()
+        write_config(self.filepath, {'key': 'new value'})
+        self.assertFalse(reloaded.wait(0.5))
+        self.assertEqual(gila.get('key'), 'value')
+
+
+if __name__ == '__main__':
+    unittest.main()